@@ -0,0 +1,66 @@
+"""Benchmark Calibration.find_best_threshold against the per-threshold search.
+
+Run from the repository root:
+    python -m benchmarks.bench_calibration
+"""
+import argparse
+import time
+import numpy as np
+import cv2
+from modules.eye_tracking.calibration import Calibration
+from modules.eye_tracking.pupil import Pupil
+
+
+def reference_best_threshold(eye_frame):
+    """The original search: full image processing for each of the 19 thresholds"""
+    average_iris_size = 0.48
+    trials = {}
+    for threshold in range(5, 100, 5):
+        iris_frame = Pupil.image_processing(eye_frame, threshold)
+        trials[threshold] = Calibration.iris_size(iris_frame)
+    best_threshold, _ = min(trials.items(), key=lambda p: abs(p[1] - average_iris_size))
+    return best_threshold
+
+
+def synthetic_eyes(count, seed=0):
+    """Gray eye crops with a dark pupil on a lighter, noisy background"""
+    rng = np.random.default_rng(seed)
+    eyes = []
+    for _ in range(count):
+        height, width = rng.integers(20, 36), rng.integers(36, 64)
+        eye = rng.normal(rng.integers(90, 200), 20, (height, width)).clip(0, 255).astype(np.uint8)
+        center = (int(rng.integers(12, width - 12)), int(rng.integers(8, height - 8)))
+        cv2.circle(eye, center, int(rng.integers(4, 9)), int(rng.integers(10, 60)), -1)
+        eyes.append(eye)
+    return eyes
+
+
+def time_per_call(fn, eyes, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for eye in eyes:
+            fn(eye)
+    return (time.perf_counter() - start) / (repeat * len(eyes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200, help="number of synthetic eye crops")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    eyes = synthetic_eyes(args.frames)
+    mismatches = sum(reference_best_threshold(eye) != Calibration.find_best_threshold(eye) for eye in eyes)
+    if mismatches:
+        raise SystemExit(f"{mismatches}/{len(eyes)} chosen thresholds differ from the reference")
+
+    reference = time_per_call(reference_best_threshold, eyes, args.repeat)
+    single_pass = time_per_call(Calibration.find_best_threshold, eyes, args.repeat)
+    print(f"identical thresholds on {len(eyes)} eye crops")
+    print(f"per-threshold search: {reference * 1e6:8.1f} us/eye")
+    print(f"single-pass search:   {single_pass * 1e6:8.1f} us/eye")
+    print(f"speedup:              {reference / single_pass:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
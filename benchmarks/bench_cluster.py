@@ -0,0 +1,72 @@
+"""Throughput of the cluster server mode as workers are added.
+
+Starts a WorkerCluster of offline models (see benchmarks/offline.py) for
+each worker count, streams JPEG-encoded synthetic frames from several
+concurrent sessions through it and reports frames per second, to check
+that throughput grows with the number of cores.
+
+Run from the repository root:
+    python -m benchmarks.bench_cluster --workers 1 2 4 --sessions 8
+"""
+import argparse
+import functools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+from benchmarks.offline import OfflineRegistry, SyntheticFaceDetector, synthetic_frames
+from core.cluster import WorkerCluster
+
+
+def run(workers, sessions, payloads, pose_engine):
+    registry_factory = functools.partial(OfflineRegistry, detector=SyntheticFaceDetector(),
+                                         pose_engines=(pose_engine,), default_pose_engine=pose_engine)
+    cluster = WorkerCluster(workers=workers, registry_factory=registry_factory)
+    try:
+        session_ids = [cluster.start(pose_engine) for _ in range(sessions)]
+
+        def stream(session_id):
+            session = cluster.get(session_id)
+            for payload in payloads:
+                session.process_frame(payload)
+
+        # One client thread per session, like one WebSocket per student
+        start = time.perf_counter()
+        with ThreadPoolExecutor(sessions) as pool:
+            list(pool.map(stream, session_ids))
+        elapsed = time.perf_counter() - start
+        for session_id in session_ids:
+            cluster.stop(session_id)
+    finally:
+        cluster.close()
+    return {"workers": workers, "sessions": sessions, "frames": sessions * len(payloads),
+            "seconds": elapsed, "frames_per_second": sessions * len(payloads) / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions")
+    parser.add_argument("--frames", type=int, default=30, help="frames per session")
+    parser.add_argument("--pose-engine", default="pnp", choices=("hopenet", "pnp"))
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    payloads = [cv2.imencode(".jpg", frame)[1].tobytes() for frame in synthetic_frames(args.frames)]
+    print(f"{len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()} cores available")
+    results = []
+    for workers in args.workers:
+        result = run(workers, args.sessions, payloads, args.pose_engine)
+        speedup = result["frames_per_second"] / results[0]["frames_per_second"] if results else 1.0
+        result["speedup"] = speedup
+        results.append(result)
+        print(f"{workers:3} worker(s)  {result['frames_per_second']:8.1f} frames/s  x{speedup:.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Speed against detection rate of the face detector backends.
+
+Every configuration runs full-frame detection (no tracking) followed by the
+landmark model on the same frames of a recorded video. Without ground truth,
+the detection rate is the share of frames in which at least one face was
+found; `agreement` is the share of frames whose face box overlaps the
+reference configuration's (the first one) by IoU >= 0.5, which exposes
+false positives and misplaced boxes.
+
+Run from the repository root:
+    python -m benchmarks.bench_detectors --video lecture.mp4 --landmarks trained_models/shape_predictor_68_face_landmarks.dat
+    python -m benchmarks.bench_detectors --video lecture.mp4 --yunet trained_models/face_detection_yunet_2023mar.onnx
+"""
+import argparse
+import json
+from datetime import datetime
+import dlib
+from benchmarks.bench_pipeline import measure
+from benchmarks.offline import TemplatePredictor, recorded_frames
+from core.detector_backends import make_backend
+from core.face_detector import FaceDetector
+from core.frame_context import FrameContext
+from core.identity import iou
+
+# (label, backend, backend options, detect_scale); the first one is the reference for `agreement`
+CONFIGURATIONS = [
+    ("hog", "hog", {"upsample": 0}, 1.0),
+    ("hog x0.5", "hog", {"upsample": 0}, 0.5),
+    ("hog upsample=1", "hog", {"upsample": 1}, 1.0),
+    ("haar", "haar", {}, 1.0),
+    ("haar x0.5", "haar", {"min_size": 20}, 0.5),
+]
+YUNET_CONFIGURATIONS = [
+    ("yunet", "yunet", {}, 1.0),
+    ("yunet x0.5", "yunet", {}, 0.5),
+]
+
+
+def detect_all(detector, contexts, scale):
+    """Largest face box of every frame (None when nothing was found)"""
+    boxes = []
+    for context in contexts:
+        rects = [rect for rect, _ in detector.detect_rects(context.gray, scale)]
+        faces = detector.describe(context.gray, rects)
+        boxes.append(max((face["bbox"] for face in faces), key=lambda b: b[2] * b[3]) if faces else None)
+    return boxes
+
+
+def run(frames, configurations, predictor, repeat):
+    # Frames are converted once, like in the analyzer: only detection and landmarks are timed
+    contexts = [FrameContext(frame) for frame in frames]
+    for context in contexts:
+        context.gray
+    results, reference = {}, None
+    for label, name, options, scale in configurations:
+        detector = FaceDetector(predictor=predictor, backend=make_backend(name, **options))
+        boxes = detect_all(detector, contexts, scale)
+        if reference is None:
+            reference = boxes
+        latency = measure(lambda context: detector.describe(
+            context.gray, [rect for rect, _ in detector.detect_rects(context.gray, scale)]), contexts, repeat)
+        found = sum(box is not None for box in boxes)
+        agree = sum((box is None and ref is None) or (box is not None and ref is not None and iou(box, ref) >= 0.5)
+                    for box, ref in zip(boxes, reference))
+        results[label] = {
+            **latency,
+            "backend": name, "options": options, "detect_scale": scale,
+            "detection_rate": found / len(frames),
+            "agreement": agree / len(frames),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--video", required=True, help="recorded footage to detect faces in")
+    parser.add_argument("--frames", type=int, default=300, help="number of frames")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--landmarks", help="dlib shape predictor (default: the template landmarks, so "
+                                            "timings leave out the real landmark model)")
+    parser.add_argument("--yunet", help="YuNet ONNX model; adds the yunet configurations")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    frames = recorded_frames(args.video, args.frames)
+    configurations = list(CONFIGURATIONS)
+    if args.yunet:
+        configurations += [(label, name, {**options, "model_path": args.yunet}, scale)
+                           for label, name, options, scale in YUNET_CONFIGURATIONS]
+    predictor = dlib.shape_predictor(args.landmarks) if args.landmarks else TemplatePredictor()
+    results = run(frames, configurations, predictor, args.repeat)
+
+    print(f"{'configuration':18} {'p50':>9} {'p95':>9} {'fps':>8} {'detected':>9} {'agreement':>10}")
+    for label, result in results.items():
+        print(f"{label:18} {result['p50_ms']:7.2f}ms {result['p95_ms']:7.2f}ms {result['per_second']:8.1f}"
+              f" {result['detection_rate']:9.1%} {result['agreement']:10.1%}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "created": datetime.now().isoformat(),
+                "inputs": {"video": args.video, "frames": len(frames), "landmarks": args.landmarks or "template"},
+                "reference": configurations[0][0],
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Latency and throughput of every pipeline stage, offline.
+
+Uses random-weight Hopenet and ViT models, a template landmark model and
+synthetic frames (or a recorded video), writes the results to JSON and
+optionally compares them with a stored baseline.
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline --output bench.json
+    python -m benchmarks.bench_pipeline --baseline bench.json      # exits 1 on regressions
+"""
+import argparse
+import json
+import platform
+import time
+from datetime import datetime
+import numpy as np
+import cv2
+from benchmarks.bench_calibration import synthetic_eyes
+from benchmarks.offline import OfflineRegistry, SyntheticFaceDetector, recorded_frames, synthetic_frames
+from face_analyzer import FaceAnalyzer
+from modules.eye_tracking.calibration import Calibration
+from modules.eye_tracking.eye import Eye
+
+
+def measure(fn, inputs, repeat=1, warmup=2):
+    """Call fn on every input `repeat` times; per-call latency percentiles and calls per second"""
+    for item in inputs[:warmup]:
+        fn(item)
+    latencies = []
+    for _ in range(repeat):
+        for item in inputs:
+            start = time.perf_counter()
+            fn(item)
+            latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+    return {
+        "calls": len(latencies),
+        "mean_ms": float(latencies.mean()),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "per_second": float(1000 / latencies.mean()),
+    }
+
+
+def run(frames, models, repeat):
+    detector = models.face_detector
+    grays = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames]
+    # Frames where a face was found, with its landmarks, for the per-face stages
+    faces = [(frame, gray, found[0]) for frame, gray in zip(frames, grays)
+             for found in [detector.detect_faces(frame)] if found]
+    if not faces:
+        raise SystemExit("No face found in any frame")
+
+    calibration = Calibration()
+    head_orientation = models.head_orientation
+    emotion_detector = models.emotion_detector
+    crops = [frame[y:y+h, x:x+w] for frame, _, face in faces for x, y, w, h in [face["bbox"]]]
+
+    results = {
+        "face_detector.detect_faces": measure(detector.detect_faces, frames, repeat),
+        "eye.pupil": measure(lambda f: Eye(f[1], f[2]["landmarks"], 0, calibration), faces, repeat),
+        "calibration.find_best_threshold": measure(Calibration.find_best_threshold, synthetic_eyes(200), repeat),
+        "head_orientation.estimate_pose": measure(
+            lambda f: head_orientation.estimate_pose(f[0], f[2]["bbox"]), faces, repeat),
+        "emotion_detector.detect_emotion": measure(emotion_detector.detect_emotion, crops, repeat),
+    }
+
+    analyzer = FaceAnalyzer(models)
+    analyzer.start_session()
+    results["face_analyzer.analyze"] = measure(analyzer.analyze, frames, repeat)
+    return results, len(faces)
+
+
+def compare(results, baseline, tolerance):
+    """Print current vs baseline p50 latency; return the benchmarks slower than tolerance allows"""
+    regressions = []
+    print(f"{'benchmark':36} {'baseline p50':>13} {'current p50':>13} {'change':>8}")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:36} {'-':>13} {current['p50_ms']:11.2f}ms {'new':>8}")
+            continue
+        change = current["p50_ms"] / previous["p50_ms"] - 1
+        flag = "  <-- regression" if change > tolerance else ""
+        print(f"{name:36} {previous['p50_ms']:11.2f}ms {current['p50_ms']:11.2f}ms {change:+7.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=30, help="number of frames")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--video", help="benchmark on frames of this video instead of synthetic ones")
+    parser.add_argument("--landmarks", help="dlib shape predictor to use instead of the template landmarks")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p50 slowdown before failing (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if args.video:
+        frames = recorded_frames(args.video, args.frames)
+        detector = None  # Real faces: dlib's HOG detector
+    else:
+        frames = synthetic_frames(args.frames)
+        detector = SyntheticFaceDetector()
+    models = OfflineRegistry(detector=detector, landmarks_path=args.landmarks)
+    try:
+        results, nb_faces = run(frames, models, args.repeat)
+    finally:
+        models.close()
+
+    for name, result in results.items():
+        print(f"{name:36} p50 {result['p50_ms']:8.2f}ms  p95 {result['p95_ms']:8.2f}ms  {result['per_second']:8.1f}/s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "created": datetime.now().isoformat(),
+                "environment": {"python": platform.python_version(), "machine": platform.machine(),
+                                "processor": platform.processor()},
+                "inputs": {"frames": len(frames), "frames_with_face": nb_faces,
+                           "source": args.video or "synthetic", "repeat": args.repeat},
+                "results": results,
+            }, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} benchmark(s) slower than the baseline: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Offline stand-ins for the models and inputs of the pipeline.
+
+Nothing here downloads or reads model files: Hopenet and the ViT have the
+production architectures with random weights, the 68 landmarks come from a
+fixed mean-face template, and synthetic frames show a drawn face laid out on
+that same template so the eye and pupil code has real eyes to work on.
+"""
+import math
+import cv2
+import dlib
+import numpy as np
+from core.registry import ModelRegistry
+
+# Mean 68-point face in box coordinates (0..1), following the iBUG point order
+_jaw = [(0.5 - 0.48 * math.cos(t), 0.25 + 0.75 * math.sin(t)) for t in np.linspace(0, math.pi, 17)]
+_brows = [(0.12 + 0.075 * i, 0.16 - 0.04 * math.sin(math.pi * i / 4)) for i in range(5)]
+_nose = [(0.5, 0.30 + 0.08 * i) for i in range(4)] + [(0.40 + 0.05 * i, 0.62 + 0.02 * (i in (1, 2, 3))) for i in range(5)]
+_left_eye = [(0.22, 0.32), (0.27, 0.29), (0.33, 0.29), (0.38, 0.32), (0.33, 0.35), (0.27, 0.35)]
+_outer_mouth = [(0.5 - 0.17 * math.cos(t), 0.80 - 0.07 * math.sin(t)) for t in np.linspace(0, 2 * math.pi, 12, endpoint=False)]
+_inner_mouth = [(0.5 - 0.12 * math.cos(t), 0.80 - 0.03 * math.sin(t)) for t in np.linspace(0, 2 * math.pi, 8, endpoint=False)]
+MEAN_FACE = np.array(
+    _jaw + _brows + [(1 - x, y) for x, y in reversed(_brows)] + _nose
+    + _left_eye + [(1 - x, y) for x, y in (_left_eye[3], _left_eye[2], _left_eye[1], _left_eye[0], _left_eye[5], _left_eye[4])]
+    + _outer_mouth + _inner_mouth
+)
+SKIN = (140, 170, 210)  # BGR, gray level about 178
+
+
+class TemplatePredictor:
+    """Stand-in for dlib.shape_predictor: places MEAN_FACE in the face rect"""
+    def __call__(self, image, rect):
+        points = [dlib.point(int(rect.left() + u * rect.width()), int(rect.top() + v * rect.height()))
+                  for u, v in MEAN_FACE]
+        return dlib.full_object_detection(rect, points)
+
+
+class SyntheticFaceDetector:
+    """Stand-in for dlib's HOG detector on synthetic frames: the face is the
+    bounding box of skin-coloured pixels. Same `run` contract as dlib."""
+    def run(self, image, upsample=0, threshold=0.0):
+        mask = cv2.inRange(image, 150, 205)
+        if cv2.countNonZero(mask) < 100:
+            return [], [], []
+        x, y, w, h = cv2.boundingRect(mask)
+        return [dlib.rectangle(x, y, x + w, y + h)], [1.0], [0]
+
+
+def random_hopenet():
+    from modules.head_pose.model import Hopenet, Bottleneck
+    import torch
+    torch.manual_seed(0)
+    return Hopenet(block=Bottleneck, layers=[3, 4, 6, 3], num_bins=66)
+
+
+def random_vit():
+    """ViT-Base/16 at 224x224 with the 7 expression classes, like trpakov/vit-face-expression"""
+    from transformers import ViTConfig, ViTForImageClassification, ViTImageProcessor
+    import torch
+    torch.manual_seed(0)
+    model = ViTForImageClassification(ViTConfig(num_labels=7))
+    processor = ViTImageProcessor(size={"height": 224, "width": 224}, image_mean=[0.5] * 3, image_std=[0.5] * 3)
+    return model, processor
+
+
+class OfflineRegistry(ModelRegistry):
+    """ModelRegistry built from the offline stand-ins.
+
+    `detector` is dlib's HOG detector by default (it ships with dlib);
+    `landmarks_path` loads the real shape predictor when one is available.
+    """
+    def __init__(self, detector=None, landmarks_path=None, **kwargs):
+        self._detector = detector
+        self._landmarks_path = landmarks_path
+        super().__init__(**kwargs)
+
+    def _load_face_detector(self, landmarks_path):
+        from core.face_detector import FaceDetector
+        predictor = None if self._landmarks_path else TemplatePredictor()
+        return FaceDetector(self._landmarks_path, detector=self._detector, predictor=predictor)
+
+    @staticmethod
+    def _load_hopenet(hopenet_path):
+        from modules.head_pose.orientation import HeadOrientation
+        return HeadOrientation(backend="eager", model=random_hopenet())
+
+    @staticmethod
+    def _load_emotion():
+        from modules.emotion.emotion_detector import EmotionDetector
+        model, processor = random_vit()
+        return EmotionDetector(backend="eager", model=model, processor=processor)
+
+
+def draw_face(frame, bbox, gaze=0.0):
+    """Draw a face filling `bbox` on MEAN_FACE; `gaze` (-1..1) moves the pupils sideways"""
+    x, y, w, h = bbox
+    points = (MEAN_FACE * (w, h) + (x, y)).astype(np.int32)
+    cv2.ellipse(frame, (x + w // 2, y + h // 2), (w // 2, h // 2), 0, 0, 360, SKIN, -1)
+    for eye in (points[36:42], points[42:48]):
+        cv2.fillPoly(frame, [eye], (255, 255, 255))
+        center = eye.mean(axis=0)
+        width = eye[:, 0].max() - eye[:, 0].min()
+        pupil = (int(center[0] + gaze * width * 0.25), int(center[1]))
+        cv2.circle(frame, pupil, max(2, int(width * 0.18)), (30, 25, 20), -1)
+    for brow in (points[17:22], points[22:27]):
+        cv2.polylines(frame, [brow], False, (40, 60, 90), 2)
+    cv2.polylines(frame, [points[27:31]], False, (110, 140, 180), 2)
+    cv2.fillPoly(frame, [points[48:60]], (60, 60, 150))
+    return frame
+
+
+def synthetic_frames(count, width=640, height=480, seed=0):
+    """Frames with one drawn face drifting and glancing around on a dark noisy background"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(count):
+        frame = rng.integers(0, 80, (height, width, 3), dtype=np.uint8)
+        size = int(rng.integers(150, 200))
+        x = int(width / 2 - size / 2 + 40 * math.sin(i / 10))
+        y = int(height / 2 - size / 2 + 20 * math.cos(i / 15))
+        frames.append(draw_face(frame, (x, y, size, int(size * 1.1)), gaze=math.sin(i / 5)))
+    return frames
+
+
+def recorded_frames(path, count, width=640, height=480):
+    """Up to `count` frames of a video file, resized like the analyzer does"""
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(frame, (width, height)))
+    cap.release()
+    if not frames:
+        raise SystemExit(f"Could not read frames from {path}")
+    return frames
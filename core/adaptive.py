@@ -0,0 +1,65 @@
+from .config import ADAPTIVE_QUALITY, QUALITY_LEVELS
+
+
+class AdaptiveQuality:
+    """Picks a quality level that keeps frames within a latency budget.
+
+    The average frame time (an exponential moving average) is compared with
+    1 / target_fps. After `patience` frames over budget the controller moves
+    one level down the list of `levels` (each cheaper than the one before);
+    after `patience` frames under `headroom` x budget it moves one level back
+    up. Counters restart after every change so the new level is judged on
+    its own frames. When a step up has to be undone right away, the next
+    step up waits twice as long, so levels with very different costs do not
+    keep alternating.
+    """
+    def __init__(self, target_fps=ADAPTIVE_QUALITY["target_fps"], levels=QUALITY_LEVELS,
+                 smoothing=ADAPTIVE_QUALITY["smoothing"], patience=ADAPTIVE_QUALITY["patience"],
+                 headroom=ADAPTIVE_QUALITY["headroom"]):
+        self.target_fps = target_fps
+        self.budget = 1.0 / target_fps
+        self.levels = levels
+        self.smoothing = smoothing
+        self.patience = patience
+        self.headroom = headroom
+        self.index = 0
+        self.changes = 0
+        self.average = None
+        self._over = 0
+        self._under = 0
+        self._up_patience = patience
+        self._probing = False  # Last change was a step up that has not proven itself yet
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    def update(self, seconds):
+        """Account for one frame; returns the new level when it changed, else None"""
+        self.average = seconds if self.average is None else self.average + self.smoothing * (seconds - self.average)
+        if self.average > self.budget:
+            self._over, self._under = self._over + 1, 0
+        elif self.average < self.budget * self.headroom:
+            self._over, self._under = 0, self._under + 1
+        else:
+            self._over = self._under = 0
+
+        if self._over >= self.patience and self.index < len(self.levels) - 1:
+            return self._move(1)
+        if self._under >= self._up_patience and self.index > 0:
+            return self._move(-1)
+        return None
+
+    def _move(self, step):
+        if self._probing:
+            if step > 0:
+                # The last step up could not hold: wait longer before the next try
+                self._up_patience = min(self._up_patience * 2, self.patience * 64)
+            else:
+                self._up_patience = self.patience
+        self._probing = step < 0
+        self.index += step
+        self.changes += 1
+        self.average = None
+        self._over = self._under = 0
+        return self.level
@@ -0,0 +1,78 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Groups items submitted by concurrent callers into batched calls.
+
+    A background thread waits for the first item, then keeps collecting for up
+    to `max_wait_ms` or until `max_batch` items are queued, and calls
+    `batch_fn(items)` once. `batch_fn` must return one result per item, in
+    order; each result is routed back to the future of the caller that
+    submitted the item.
+    """
+    def __init__(self, batch_fn, max_batch=16, max_wait_ms=5, name="micro-batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """Queue one item and return a Future for its result"""
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item):
+        """Submit one item and block until its batch has run"""
+        return self.submit(item).result()
+
+    def close(self):
+        """Stop the batching thread once queued items have been served"""
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None, True
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is None:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = self._collect()
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            try:
+                results = self.batch_fn(items)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
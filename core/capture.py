@@ -0,0 +1,75 @@
+import threading
+from collections import deque
+
+
+class ThreadedCapture:
+    """cv2.VideoCapture decoded on its own thread, with the same isOpened /
+    read / release interface.
+
+    With `latest_only` (live cameras) frames go into a ring of
+    `buffer_size` and `read` returns the newest one, so a slow consumer
+    always sees the present instead of a backlog; every frame it never got
+    is counted in `dropped`. Without it (video files) the thread reads ahead
+    into a queue of `buffer_size` frames and `read` returns them in order,
+    so offline runs wait on analysis rather than on decoding.
+    """
+    def __init__(self, cap, latest_only=True, buffer_size=2):
+        self.cap = cap
+        self.latest_only = latest_only
+        self.buffer_size = buffer_size
+        self.frames_read = 0
+        self.dropped = 0
+        self._frames = deque()
+        self._cond = threading.Condition()
+        self._ended = False
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+        if cap.isOpened():
+            self._thread.start()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def _run(self):
+        while not self._stopped:
+            ret, frame = self.cap.read()
+            with self._cond:
+                if not ret:
+                    self._ended = True
+                    self._cond.notify_all()
+                    return
+                if self.latest_only:
+                    if len(self._frames) >= self.buffer_size:
+                        self._frames.popleft()
+                        self.dropped += 1
+                else:
+                    while len(self._frames) >= self.buffer_size and not self._stopped:
+                        self._cond.wait()
+                self._frames.append(frame)
+                self.frames_read += 1
+                self._cond.notify_all()
+
+    def read(self):
+        """(True, frame) like VideoCapture.read, or (False, None) once the source has ended"""
+        with self._cond:
+            while not self._frames and not self._ended:
+                self._cond.wait()
+            if not self._frames:
+                return False, None
+            if self.latest_only:
+                frame = self._frames.pop()
+                self.dropped += len(self._frames)
+                self._frames.clear()
+            else:
+                frame = self._frames.popleft()
+                self._cond.notify_all()
+            return True, frame
+
+    def release(self):
+        with self._cond:
+            self._stopped = True
+            self._ended = True
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.cap.release()
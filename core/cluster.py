@@ -0,0 +1,329 @@
+"""Multi-process analysis for the "cluster" server mode.
+
+The web process keeps the HTTP/WebSocket handling and frame decoding, and
+`WorkerCluster` starts N worker processes that each load their own models
+and hold the sessions routed to them. A session always goes to worker
+crc32(session_id) % N, so its calibration and counters live in exactly one
+process. Decoded frames are copied into a per-worker shared-memory buffer
+and only the slot number and shape cross the process boundary.
+"""
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from .config import CLUSTER, MULTI_FACE, POSE_ENGINE, RECORDING
+from .decoding import decode_request
+from .metrics import METRICS, StageTimings
+from .utils import preprocess_frame
+
+
+def worker_cpus(index, threads, cpus):
+    """Cores worker `index` is pinned to: its own block of `threads`, wrapping around when there are more
+    workers than cores"""
+    return [cpus[(index * threads + i) % len(cpus)] for i in range(threads)]
+
+
+def _limit_threads(threads, cpus):
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    # Before torch and OpenCV start their thread pools
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    import cv2
+    cv2.setNumThreads(threads)
+
+
+def _worker_main(index, requests, replies, shm_name, slots, slot_bytes, threads, cpus, analysis_threads,
+                 registry_factory):
+    """Worker process: owns a ModelRegistry and the sessions routed to it"""
+    _limit_threads(threads, cpus)
+    from sessions import SessionManager
+    if registry_factory is None:
+        from .registry import ModelRegistry as registry_factory
+    models = registry_factory()
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    sessions = SessionManager(models)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frames = np.ndarray((slots, slot_bytes), np.uint8, shm.buf)
+    pool = ThreadPoolExecutor(analysis_threads, thread_name_prefix="frame-analysis")
+
+    def frame(session_id, slot, shape, decode_seconds):
+        session = sessions.get(session_id)
+        if session is None:
+            return {"error": "Tracking session not started"}
+        session.analyzer.timings.observe("decode", decode_seconds)
+        return session.analyze_frame(frames[slot, :int(np.prod(shape))].reshape(shape))
+
+    def stats(session_id, seconds):
+        session = sessions.get(session_id)
+        if session is None:
+            return {"error": "Tracking session not started"}
+        return session.window_stats(seconds)
+
+    handlers = {"start": sessions.start, "frame": frame, "stats": stats, "stop": sessions.stop}
+
+    def handle(request_id, op, args):
+        try:
+            replies.put((request_id, None, handlers[op](*args)))
+        except Exception as e:
+            # Built-in exceptions (e.g. ValueError for an unknown pose engine) keep their type; others
+            # may not unpickle in the web process
+            if type(e).__module__ != "builtins":
+                e = RuntimeError(f"{type(e).__name__}: {e}")
+            replies.put((request_id, e, None))
+
+    replies.put((None, None, models.load_timings))  # Ready
+    try:
+        while True:
+            message = requests.get()
+            if message is None:
+                break
+            request_id, op, args = message
+            if op == "metrics":
+                # Answered right away, not behind queued frames
+                replies.put((request_id, None, METRICS.stages.snapshot()))
+            else:
+                pool.submit(handle, request_id, op, args)
+    finally:
+        pool.shutdown(wait=True)
+        models.close()
+        del frames
+        shm.close()
+
+
+class WorkerProcess:
+    """Web-process side of one worker: its request/reply queues and frame buffer"""
+    def __init__(self, context, index, slots, slot_bytes, threads, cpus, analysis_threads, registry_factory):
+        self.index = index
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        self.frames = np.ndarray((slots, slot_bytes), np.uint8, self.shm.buf)
+        self.free_slots = queue.Queue()
+        for slot in range(slots):
+            self.free_slots.put(slot)
+        self.load_timings = None
+        self.requests = context.Queue()
+        self.replies = context.Queue()
+        self.process = context.Process(
+            target=_worker_main, name=f"knowly-worker-{index}", daemon=True,
+            args=(index, self.requests, self.replies, self.shm.name, slots, slot_bytes, threads, cpus,
+                  analysis_threads, registry_factory))
+        self._pending = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_replies, name=f"worker-{index}-replies", daemon=True)
+
+    def start(self):
+        self.process.start()
+
+    def wait_ready(self, timeout):
+        """Block until the worker has loaded its models"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                _, _, self.load_timings = self.replies.get(timeout=1)
+                break
+            except queue.Empty:
+                if not self.process.is_alive():
+                    raise RuntimeError(f"Worker {self.index} exited while loading models "
+                                       f"(exit code {self.process.exitcode})")
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Worker {self.index} did not load its models within {timeout}s")
+        self._reader.start()
+
+    @property
+    def alive(self):
+        return self.process.is_alive()
+
+    def _read_replies(self):
+        while True:
+            try:
+                request_id, error, value = self.replies.get(timeout=1)
+            except queue.Empty:
+                if self.process.is_alive():
+                    continue
+                self._fail_pending(RuntimeError(f"Worker {self.index} exited (exit code {self.process.exitcode})"))
+                return
+            except (EOFError, OSError):
+                self._fail_pending(RuntimeError(f"Worker {self.index} is shut down"))
+                return
+            with self._lock:
+                future = self._pending.pop(request_id, None)
+            if future is None:
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+
+    def _fail_pending(self, error):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(error)
+
+    def call(self, op, *args):
+        """Send a request to the worker; returns a Future of its reply"""
+        future = Future()
+        if not self.process.is_alive():
+            future.set_exception(RuntimeError(f"Worker {self.index} is not running"))
+            return future
+        with self._lock:
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+        self.requests.put((request_id, op, args))
+        return future
+
+    def analyze(self, session_id, frame, decode_seconds, timeout):
+        """Hand a decoded frame to the worker through shared memory and wait for its result"""
+        if frame.nbytes > self.slot_bytes:
+            frame = preprocess_frame(frame)
+        frame = np.ascontiguousarray(frame)
+        try:
+            slot = self.free_slots.get(timeout=timeout)
+        except queue.Empty:
+            return {"error": "Timed out waiting for a free frame buffer"}
+        try:
+            self.frames[slot, :frame.nbytes] = frame.reshape(-1)
+            future = self.call("frame", session_id, slot, frame.shape, decode_seconds)
+        except BaseException:
+            self.free_slots.put(slot)
+            raise
+        # The slot is reused only once the worker has answered (and so is done reading it),
+        # even when this caller stopped waiting
+        future.add_done_callback(lambda _: self.free_slots.put(slot))
+        return future.result(timeout)
+
+    def stop(self, timeout=30):
+        try:
+            if self.process.pid is not None:
+                self.requests.put(None)
+                self.process.join(timeout)
+        finally:
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+            del self.frames
+            self.shm.close()
+            self.shm.unlink()
+
+
+class RemoteSession:
+    """A session living in a worker process, with the Session interface used by main.py"""
+    def __init__(self, session_id, worker, timeout):
+        self.session_id = session_id
+        self.worker = worker
+        self.timeout = timeout
+
+    def process_frame(self, contents, raw_shape=None):
+        """Decode a frame here and analyze it in the session's worker (runs on a web-process thread)"""
+        start = time.perf_counter()
+        try:
+            frame = decode_request(contents, raw_shape)
+        except ValueError as e:
+            return {"error": str(e)}
+        result = self.worker.analyze(self.session_id, frame, time.perf_counter() - start, self.timeout)
+        if "error" not in result:
+            METRICS.frame_done()
+        return result
+
+    def window_stats(self, seconds):
+        return self.worker.call("stats", self.session_id, seconds).result(self.timeout)
+
+
+class WorkerCluster:
+    """Worker processes plus the SessionManager interface used by main.py.
+
+    Each worker gets `threads_per_worker` torch/OpenCV threads and, with
+    `pin_cpus`, its own cores, so workers do not compete for the same ones.
+    `registry_factory` builds each worker's models (ModelRegistry by
+    default); it is pickled to the workers, so it must be importable.
+    """
+    def __init__(self, workers=CLUSTER["workers"], threads_per_worker=CLUSTER["threads_per_worker"],
+                 pin_cpus=CLUSTER["pin_cpus"], analysis_threads=CLUSTER["analysis_threads"],
+                 slots=CLUSTER["slots"], slot_bytes=CLUSTER["slot_bytes"], start_timeout=CLUSTER["start_timeout"],
+                 timeout=60, registry_factory=None):
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+        workers = workers or max(1, len(cpus) // threads_per_worker)
+        self.slots = slots
+        self.timeout = timeout
+        self.sessions = {}
+        self._lock = threading.Lock()
+        context = multiprocessing.get_context("spawn")  # No forked copies of the web process's threads
+        self.workers = [
+            WorkerProcess(context, index, slots, slot_bytes, threads_per_worker,
+                          worker_cpus(index, threads_per_worker, cpus) if pin_cpus else None,
+                          analysis_threads, registry_factory)
+            for index in range(workers)
+        ]
+        try:
+            for worker in self.workers:
+                worker.start()
+            for worker in self.workers:
+                worker.wait_ready(start_timeout)
+        except BaseException:
+            self.close()
+            raise
+
+    def __len__(self):
+        return len(self.sessions)
+
+    @property
+    def capacity(self):
+        """Frames that can be in flight across all workers"""
+        return len(self.workers) * self.slots
+
+    @property
+    def load_timings(self):
+        return {f"worker-{worker.index}": worker.load_timings for worker in self.workers}
+
+    def route(self, session_id):
+        """Worker of a session: stable for the session's lifetime and across web processes"""
+        return self.workers[zlib.crc32(session_id.encode()) % len(self.workers)]
+
+    def start(self, pose_engine=POSE_ENGINE, multi_face=MULTI_FACE["enabled"], record=RECORDING["enabled"]):
+        """Create a session in its worker and return its ID"""
+        session_id = uuid.uuid4().hex
+        worker = self.route(session_id)
+        worker.call("start", pose_engine, multi_face, record, session_id).result(self.timeout)
+        with self._lock:
+            self.sessions[session_id] = RemoteSession(session_id, worker, self.timeout)
+        return session_id
+
+    def get(self, session_id):
+        return self.sessions.get(session_id)
+
+    def stop(self, session_id):
+        """End a session in its worker, which saves the report; returns the report (None if unknown)"""
+        with self._lock:
+            session = self.sessions.pop(session_id, None)
+        if session is None:
+            return None
+        return session.worker.call("stop", session_id).result(self.timeout)
+
+    def stage_timings(self):
+        """Stage latencies of every running worker merged into one StageTimings"""
+        timings = StageTimings()
+        timings.merge(METRICS.stages.snapshot())
+        futures = [worker.call("metrics") for worker in self.workers if worker.alive]
+        for future in futures:
+            try:
+                timings.merge(future.result(5))
+            except Exception:
+                pass  # A worker that cannot answer leaves its samples out of this scrape
+        return timings
+
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
@@ -1,10 +1,133 @@
 # Configuration settings
 MODEL_PATHS = {
     "landmarks": "trained_models/shape_predictor_68_face_landmarks.dat",
-    "hopenet": "trained_models/hopenet_robust_alpha1.pkl"
+    "hopenet": "trained_models/hopenet_robust_alpha1.pkl",
+    "yunet": "trained_models/face_detection_yunet_2023mar.onnx"  # Only needed for the "yunet" detector backend
 }
 
 # Input source 
 SOURCE = "realtime"  # "realtime" or "video"
 VIDEO_PATH = "C:\\Users\\MH\\Downloads\\Telegram Desktop\\video_2025-03-09_23-43-24.mp4"  # video file path if SOURCE is "video"
-CAMERA_ID = 0  # Camera index for realtime input
\ No newline at end of file
+CAMERA_ID = 0  # Camera index for realtime input
+
+# Capture on a background thread: a camera hands out its newest frame (older ones are dropped),
+# a video file is read ahead so offline runs are bound by analysis
+CAPTURE = {
+    "threaded": True,
+    "buffer_size": 2,   # Camera ring buffer (frames)
+    "read_ahead": 32,   # Decoded video frames kept ahead of the analysis
+}
+
+# Web server (python main.py). "single" analyzes frames in the web process; "cluster" starts
+# CLUSTER["workers"] analysis processes and routes every session to one of them by its ID
+SERVER = {
+    "host": "0.0.0.0",
+    "port": 8000,
+    "mode": "single",
+}
+
+# Worker processes of the "cluster" server mode. Each one loads its own copy of the models,
+# so memory grows with the number of workers.
+CLUSTER = {
+    "workers": None,            # None = one per `threads_per_worker` cores
+    "threads_per_worker": 1,    # torch/OpenCV threads of a worker, and the cores it is pinned to
+    "pin_cpus": True,           # Pin each worker to its own cores (Linux)
+    "analysis_threads": 1,      # Frames a worker analyzes at the same time
+    "slots": 4,                 # Shared-memory frame buffers per worker (frames in flight)
+    "slot_bytes": 1280 * 720 * 3,  # Larger decoded frames are resized to the analysis size before hand-off
+    "start_timeout": 300,       # Seconds a worker may take to load its models
+}
+
+# Server frame analysis pool
+EXECUTOR = {
+    "max_workers": 2,   # Threads running FaceAnalyzer.analyze
+    "max_pending": 8,   # Frames running or queued before new ones are dropped
+}
+
+# Cross-session micro-batching of Hopenet and ViT forward passes
+BATCHING = {
+    "enabled": False,   # Only pays off with several frames in flight (EXECUTOR max_workers > 1)
+    "max_batch": 16,    # Largest batch per forward pass
+    "max_wait_ms": 5,   # How long the first queued crop may wait for others
+}
+
+# Face detector backend: "hog" (dlib), "haar" (OpenCV's bundled cascade, fastest, frontal faces only)
+# or "yunet" (OpenCV DNN, needs MODEL_PATHS["yunet"]). Every backend feeds the same dlib landmark model;
+# downscaling before detection is FACE_TRACKING["detect_scale"].
+FACE_DETECTOR = {
+    "backend": "hog",
+    "hog": {"upsample": 0},  # Image doublings before detection: smaller faces found, ~4x the cost each
+    "haar": {"scale_factor": 1.1, "min_neighbors": 5, "min_size": 30},
+    "yunet": {"model_path": MODEL_PATHS["yunet"], "score_threshold": 0.6, "nms_threshold": 0.3},
+}
+
+# Detect-then-track mode for the face detector (per session)
+FACE_TRACKING = {
+    "enabled": True,
+    "redetect_interval": 10,  # Full-frame detection at least every N frames
+    "roi_margin": 0.25,       # Search box = previous face box expanded by this fraction per side
+    "roi_face_size": 100,     # Faces are downscaled to about this width for the ROI search
+    "min_score": 0.0,         # Detector score below which the track is dropped and a full detection runs
+    "detect_scale": 1.0,      # Downscale factor for full-frame detection (landmarks stay full resolution)
+}
+
+# Analyze every face in frame instead of only the first one (per-face IDs, calibration and summaries)
+MULTI_FACE = {
+    "enabled": False,
+    "min_iou": 0.3,    # Box overlap needed to keep a face's ID from one frame to the next
+    "max_missed": 15,  # Frames a face may go undetected before its ID is retired
+    "min_report_frames": 30,  # Retired faces analyzed in fewer frames are only counted in the session totals
+}
+
+# Run head pose and emotion on a shared thread pool while gaze runs on the frame's own thread,
+# so a frame costs about its slowest stage instead of the sum of all three
+STAGE_CONCURRENCY = {
+    "enabled": False,
+    "workers": 2,           # Stage threads shared by every session in the process
+    "torch_threads": None,  # Intra-op threads per torch call while two models overlap; None = half the cores
+}
+
+# Optional per-frame time series (pose, gaze, blink, emotion, focus) written by a background thread
+RECORDING = {
+    "enabled": False,
+    "dir": "session_recordings",
+    "flush_interval": 1.0,  # Seconds between writes to disk
+    "max_pending": 4096,    # Records waiting for the writer before new ones are dropped
+}
+
+REPORT_INDEX = True  # Also index saved reports in session_reports/index.sqlite (python -m core.report_index)
+
+# Adaptive quality (opt-in, e.g. demo.py --adaptive): when frames take longer than the target allows,
+# step down through QUALITY_LEVELS, and back up once there is headroom again
+ADAPTIVE_QUALITY = {
+    "target_fps": 15,
+    "smoothing": 0.1,  # Weight of the newest frame in the average frame time
+    "patience": 15,    # Frames over budget (or with headroom) before changing level
+    "headroom": 0.6,   # Step back up when frames take less than this fraction of the budget
+}
+# Cheapest last; each level keeps the savings of the ones before it
+QUALITY_LEVELS = (
+    {"name": "full"},
+    {"name": "low_res_detection", "detect_scale": 0.5},
+    {"name": "no_emotion", "detect_scale": 0.5, "emotion": False},
+    {"name": "pnp_pose", "detect_scale": 0.5, "emotion": False, "pose_engine": "pnp"},
+    {"name": "half_rate", "detect_scale": 0.5, "emotion": False, "pose_engine": "pnp", "analysis_interval": 2},
+    {"name": "third_rate", "detect_scale": 0.5, "emotion": False, "pose_engine": "pnp", "analysis_interval": 3},
+)
+
+# Per-stage execution cadence: run a stage every N frames and reuse its last result in between
+STAGE_CADENCE = {
+    "pose": 2,
+    "emotion": 10,
+}
+STAGE_CACHE_MAX_MOTION = 0.2  # Rerun cached stages when the face box moves or resizes by more than this fraction
+
+# Inference backend for Hopenet and the ViT emotion model: "eager", "torchscript" or "onnx".
+# Exported graphs are cached next to the weights and checked against eager outputs on load.
+INFERENCE_BACKEND = "eager"
+
+# Head pose engines: "hopenet" (ResNet-50) or "pnp" (cv2.solvePnP on the dlib landmarks)
+POSE_ENGINES = ("hopenet", "pnp")  # Engines loaded at startup; leave out "hopenet" to never load it
+POSE_ENGINE = "hopenet"            # Default engine for new sessions
+
+WARMUP = True  # Run a dummy face through every model at startup so the first real frame is not slow
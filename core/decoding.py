@@ -0,0 +1,79 @@
+import numpy as np
+import cv2
+
+# imdecode flags that let libjpeg scale down by 2/4/8 while decoding
+REDUCED_DECODE_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+}
+# Start-of-frame markers (baseline, progressive, lossless, arithmetic); DHT/JPG/DAC excluded
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+STANDALONE_MARKERS = {0x01, 0xD8, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7}
+
+
+def jpeg_size(data):
+    """Return (width, height) from a JPEG header without decoding, or None"""
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # Fill byte
+            i += 1
+            continue
+        if marker in STANDALONE_MARKERS:
+            i += 2
+            continue
+        length = int.from_bytes(data[i + 2:i + 4], "big")
+        if marker in SOF_MARKERS:
+            if i + 9 > len(data):
+                return None
+            height = int.from_bytes(data[i + 5:i + 7], "big")
+            width = int.from_bytes(data[i + 7:i + 9], "big")
+            return width, height
+        if marker == 0xDA:  # Start of scan: no frame header before the image data
+            return None
+        i += 2 + length
+    return None
+
+
+def decode_frame(data, width=640, height=480):
+    """Decode an encoded image, letting libjpeg downscale when the image is much
+    larger than the analysis size so decoding lands close to (width, height)"""
+    flag = cv2.IMREAD_COLOR
+    size = jpeg_size(data)
+    if size is not None:
+        for factor, reduced_flag in REDUCED_DECODE_FLAGS.items():
+            if size[0] // factor >= width and size[1] // factor >= height:
+                flag = reduced_flag
+                break
+    return cv2.imdecode(np.frombuffer(data, np.uint8), flag)
+
+
+def decode_request(contents, raw_shape=None):
+    """Frame of a request body: an encoded image, or raw pixels when `raw_shape`
+    gives their (width, height, channels); ValueError when it cannot be read"""
+    if raw_shape is not None:
+        return raw_frame(contents, *raw_shape)
+    frame = decode_frame(contents)
+    if frame is None:
+        raise ValueError("Could not decode frame")
+    return frame
+
+
+def raw_frame(data, width, height, channels=3):
+    """Wrap raw BGR (channels=3) or grayscale (channels=1) pixels without copying"""
+    if channels not in (1, 3):
+        raise ValueError("channels must be 1 (grayscale) or 3 (BGR)")
+    if width <= 0 or height <= 0:
+        raise ValueError("width and height must be positive")
+    if len(data) != width * height * channels:
+        raise ValueError(f"Expected {width * height * channels} bytes for a {width}x{height}x{channels} frame, got {len(data)}")
+    frame = np.frombuffer(data, np.uint8)
+    if channels == 1:
+        # The pipeline works on BGR frames
+        return cv2.cvtColor(frame.reshape(height, width), cv2.COLOR_GRAY2BGR)
+    return frame.reshape(height, width, 3)
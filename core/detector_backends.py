@@ -0,0 +1,101 @@
+"""Face detector backends for FaceDetector.
+
+A backend turns a grayscale image into (dlib.rectangle, score) pairs; the
+landmark stage after it is the same dlib shape predictor whatever found the
+face. Scores are only compared within a backend (FACE_TRACKING min_score).
+"""
+import os
+import threading
+import cv2
+import dlib
+from .config import FACE_DETECTOR
+
+
+class HogBackend:
+    """dlib's HOG + linear SVM detector.
+
+    Each `upsample` doubles the image before the search: faces down to about
+    40 px instead of 80 px are found, at roughly 4x the cost per step.
+    `detector` replaces dlib's model (anything with dlib's `run` contract).
+    """
+    name = "hog"
+
+    def __init__(self, upsample=0, detector=None):
+        self.upsample = upsample
+        self.detector = detector if detector is not None else dlib.get_frontal_face_detector()
+        # dlib's object_detector keeps scratch buffers and is documented as unsafe for concurrent use;
+        # the detector is shared by every session
+        self._lock = threading.Lock()
+
+    def detect(self, gray):
+        with self._lock:
+            rects, scores, _ = self.detector.run(gray, self.upsample, 0.0)
+        return list(zip(rects, scores))
+
+
+class HaarBackend:
+    """OpenCV's bundled frontal-face Haar cascade: the cheapest backend, with
+    more false positives and no profile faces. The score is the number of
+    merged neighbouring detections."""
+    name = "haar"
+
+    def __init__(self, cascade_path=None, scale_factor=1.1, min_neighbors=5, min_size=30):
+        cascade_path = cascade_path or os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml")
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        if self.cascade.empty():
+            raise FileNotFoundError(f"Could not load the Haar cascade {cascade_path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+        self._lock = threading.Lock()  # The classifier is shared by every session
+
+    def detect(self, gray):
+        with self._lock:
+            boxes, neighbors = self.cascade.detectMultiScale2(
+                gray, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors,
+                minSize=(self.min_size, self.min_size))
+        return [(dlib.rectangle(int(x), int(y), int(x + w), int(y + h)), float(n))
+                for (x, y, w, h), n in zip(boxes, neighbors)]
+
+
+class YuNetBackend:
+    """OpenCV DNN face detector (YuNet, cv2.FaceDetectorYN) from a local ONNX
+    file, e.g. face_detection_yunet_2023mar.onnx from the OpenCV model zoo.
+
+    The model takes 3-channel input; the gray frame is replicated into it so
+    every backend shares the one conversion of the frame.
+    """
+    name = "yunet"
+
+    def __init__(self, model_path, score_threshold=0.6, nms_threshold=0.3, top_k=50):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"YuNet model {model_path} not found (download it from the OpenCV model zoo)")
+        self.model = cv2.FaceDetectorYN.create(model_path, "", (320, 320), score_threshold, nms_threshold, top_k)
+        self._lock = threading.Lock()  # The input size is model state, set per call
+
+    def detect(self, gray):
+        image = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        height, width = gray.shape[:2]
+        with self._lock:
+            self.model.setInputSize((width, height))
+            _, faces = self.model.detect(image)
+        if faces is None:
+            return []
+        results = []
+        for face in faces:
+            x, y, w, h = face[:4]
+            left, top = max(int(x), 0), max(int(y), 0)
+            right, bottom = min(int(x + w), width), min(int(y + h), height)
+            if right > left and bottom > top:
+                results.append((dlib.rectangle(left, top, right, bottom), float(face[-1])))
+        return results
+
+
+BACKENDS = {backend.name: backend for backend in (HogBackend, HaarBackend, YuNetBackend)}
+
+
+def make_backend(name=FACE_DETECTOR["backend"], **options):
+    """Backend `name` with its FACE_DETECTOR options, overridden by `options`"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown face detector backend {name!r} (available: {', '.join(BACKENDS)})")
+    return BACKENDS[name](**{**FACE_DETECTOR.get(name, {}), **options})
@@ -0,0 +1,75 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class FrameExecutor:
+    """Bounded worker pool that keeps frame analysis off the event loop.
+
+    At most `max_pending` frames may be running or queued at once; beyond that
+    `submit` refuses the frame right away so latency cannot grow without limit.
+    Frames submitted with the same `key` (a session ID) run one at a time in
+    submission order: only the oldest is on the pool, the others wait in the
+    key's queue, so one busy session holds at most one pool thread.
+    """
+    def __init__(self, max_workers=2, max_pending=8):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="frame-analysis")
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._queues = {}  # key -> deque of (fn, args, future) waiting behind the key's running frame
+        self.pending = 0
+        self.dropped = 0
+
+    def submit(self, fn, *args, key=None):
+        """Schedule fn(*args) and return its future, or None if the pool is saturated"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.dropped += 1
+            return None
+
+        future = Future()
+        with self._lock:
+            self.pending += 1
+            if key is not None:
+                if key in self._queues:
+                    self._queues[key].append((fn, args, future))
+                    return future
+                self._queues[key] = deque()
+        try:
+            self.pool.submit(self._run, key, fn, args, future)
+        except Exception:
+            self._finish(key)
+            raise
+        return future
+
+    def _run(self, key, fn, args, future):
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            self._finish(key)
+
+    def _finish(self, key):
+        """Release a finished frame's slot and put the next frame of its key on the pool"""
+        with self._lock:
+            self.pending -= 1
+            queue = self._queues.get(key) if key is not None else None
+            task = queue.popleft() if queue else None
+            if key is not None and task is None:
+                self._queues.pop(key, None)
+        self._slots.release()
+        if task is not None:
+            fn, args, future = task
+            try:
+                self.pool.submit(self._run, key, fn, args, future)
+            except RuntimeError as e:  # Shut down meanwhile
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(e)
+                self._finish(key)
+
+    def shutdown(self, wait=True):
+        self.pool.shutdown(wait=wait)
@@ -1,28 +1,138 @@
 import cv2
 import dlib
+import numpy as np
+from .config import FACE_DETECTOR
+from .detector_backends import HogBackend, make_backend
+from .frame_context import FrameContext
+from .metrics import StageTimings
+
+
+def landmark_array(shape):
+    """(68, 2) int32 array of a dlib full_object_detection, read through the binding once"""
+    return np.array([(point.x, point.y) for point in shape.parts()], dtype=np.int32)
 
 
 class FaceDetector:
-    """Unified face detection using dlib."""
-    def __init__(self, model_path="trained_models/shape_predictor_68_face_landmarks.dat"):
-        self.detector = dlib.get_frontal_face_detector()
-        self.predictor = dlib.shape_predictor(model_path)
+    """Face boxes from a detector backend, then dlib's 68 landmarks on each.
 
-    def detect_faces(self, frame):
-        """Detect faces and return bounding boxes and landmarks."""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.detector(gray)
-        if not faces:
-            return []
+    `backend` is a backend name (see core.detector_backends) or instance.
+    `detector` and `predictor` replace dlib's HOG detector and the 68-point
+    shape predictor loaded from `model_path` (e.g. offline stand-ins).
+    """
+    def __init__(self, model_path="trained_models/shape_predictor_68_face_landmarks.dat", detector=None, predictor=None,
+                 backend=FACE_DETECTOR["backend"]):
+        if detector is not None:
+            backend = HogBackend(detector=detector)
+        self.backend = make_backend(backend) if isinstance(backend, str) else backend
+        self.predictor = predictor if predictor is not None else dlib.shape_predictor(model_path)
+
+    def detect_faces(self, frame, scale=1.0):
+        """Detect faces and return bounding boxes and landmarks (frame or FrameContext)."""
+        gray = FrameContext.of(frame).gray
+        rects = [rect for rect, _ in self.detect_rects(gray, scale)]
+        return self.describe(gray, rects)
+
+    def detect_rects(self, gray, scale=1.0):
+        """Run the detector backend, optionally on a downscaled image.
 
+        Returns (rect, score) pairs with rects in `gray` coordinates.
+        """
+        image = gray
+        if scale != 1.0:
+            image = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        found = self.backend.detect(image)
+        if scale == 1.0:
+            return found
+        return [(dlib.rectangle(int(round(r.left() / scale)), int(round(r.top() / scale)),
+                                int(round(r.right() / scale)), int(round(r.bottom() / scale))), score)
+                for r, score in found]
+
+    def describe(self, gray, rects):
+        """Run the landmark model at full resolution on each face rect.
+
+        Landmarks are returned as a (68, 2) array of (x, y) points. No lock:
+        dlib documents shape_predictor as safe to call from several threads.
+        """
         results = []
-        for face in faces:
-            landmarks = self.predictor(gray, face)
+        for face in rects:
+            landmarks = landmark_array(self.predictor(gray, face))
             x, y = face.left(), face.top()
             w, h = face.right() - x, face.bottom() - y
             results.append({
                 "bbox": (x, y, w, h),
                 "landmarks": landmarks,
-                "nose_tip": (landmarks.part(30).x, landmarks.part(30).y)
+                "nose_tip": (int(landmarks[30, 0]), int(landmarks[30, 1]))
             })
-        return results
\ No newline at end of file
+        return results
+
+
+class FaceTracker:
+    """Per-session detect-then-track wrapper around a shared FaceDetector.
+
+    A full-frame detection runs every `redetect_interval` frames. In between,
+    each face is searched for only inside its previous box expanded by
+    `roi_margin`, downscaled so the face is about `roi_face_size` pixels wide.
+    Losing a face or scoring below `min_score` triggers a full detection.
+    Detection and landmark times are recorded in `timings`.
+    """
+    def __init__(self, detector, enabled=True, redetect_interval=10, roi_margin=0.25,
+                 roi_face_size=100, min_score=0.0, detect_scale=1.0, timings=None):
+        self.detector = detector
+        self.timings = timings if timings is not None else StageTimings()
+        self.enabled = enabled
+        self.redetect_interval = redetect_interval
+        self.roi_margin = roi_margin
+        self.roi_face_size = roi_face_size
+        self.min_score = min_score
+        self.detect_scale = detect_scale
+        self.tracked = []
+        self.frames_since_detection = 0
+
+    def reset(self):
+        self.tracked = []
+        self.frames_since_detection = 0
+
+    def detect_faces(self, frame):
+        """Same contract as FaceDetector.detect_faces, reusing previous boxes when possible"""
+        with self.timings.time("detect"):
+            gray = FrameContext.of(frame).gray
+            rects = None
+            if self.enabled and self.tracked and self.frames_since_detection < self.redetect_interval:
+                rects = self._track(gray)
+
+            if rects is None:
+                rects = [rect for rect, _ in self.detector.detect_rects(gray, self.detect_scale)]
+                self.frames_since_detection = 0
+            else:
+                self.frames_since_detection += 1
+
+        self.tracked = rects
+        with self.timings.time("landmarks"):
+            return self.detector.describe(gray, rects)
+
+    def _track(self, gray):
+        height, width = gray.shape[:2]
+        rects = []
+        for prev in self.tracked:
+            margin_x = int(prev.width() * self.roi_margin)
+            margin_y = int(prev.height() * self.roi_margin)
+            left, top = max(prev.left() - margin_x, 0), max(prev.top() - margin_y, 0)
+            right, bottom = min(prev.right() + margin_x, width), min(prev.bottom() + margin_y, height)
+            if right <= left or bottom <= top:
+                return None
+
+            roi = gray[top:bottom, left:right]
+            scale = min(1.0, self.roi_face_size / max(prev.width(), 1))
+            if scale == 1.0:
+                # dlib needs a contiguous buffer; the resized path already produces one
+                roi = roi.copy()
+            found = self.detector.detect_rects(roi, scale)
+            if not found:
+                return None
+
+            rect, score = max(found, key=lambda p: p[1])
+            if score < self.min_score:
+                return None
+            rects.append(dlib.rectangle(rect.left() + left, rect.top() + top,
+                                        rect.right() + left, rect.bottom() + top))
+        return rects
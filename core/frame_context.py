@@ -0,0 +1,34 @@
+import cv2
+
+
+class FrameContext:
+    """A frame plus the views of it that several stages need, each made once.
+
+    `gray` is converted on first use and shared by face detection and gaze
+    tracking; `crop(bbox)` gives Hopenet and the ViT the same face view.
+    Functions taking a frame also accept a FrameContext (see `of`), so
+    passing one through the pipeline is enough to share the work.
+    """
+    def __init__(self, frame):
+        self.frame = frame
+        self._gray = None
+        self._crops = {}
+
+    @classmethod
+    def of(cls, frame):
+        """`frame` itself when it already is a FrameContext, else a new one around it"""
+        return frame if isinstance(frame, cls) else cls(frame)
+
+    @property
+    def gray(self):
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    def crop(self, bbox):
+        bbox = tuple(bbox)
+        crop = self._crops.get(bbox)
+        if crop is None:
+            x, y, w, h = bbox
+            crop = self._crops[bbox] = self.frame[y:y+h, x:x+w]
+        return crop
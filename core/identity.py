@@ -0,0 +1,63 @@
+def iou(a, b):
+    """Intersection over union of two (x, y, w, h) boxes"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    inter_w = min(ax + aw, bx + bw) - max(ax, bx)
+    inter_h = min(ay + ah, by + bh) - max(ay, by)
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    inter = inter_w * inter_h
+    return inter / (aw * ah + bw * bh - inter)
+
+
+class FaceIdentityTracker:
+    """Gives each face a stable ID across frames by matching boxes on overlap.
+
+    Boxes are matched greedily to the tracked box they overlap most (IoU of at
+    least `min_iou`). Unmatched boxes start new IDs, and a track is forgotten
+    after `max_missed` consecutive frames without a match; the IDs forgotten by
+    the last `assign` are listed in `retired`.
+    """
+    def __init__(self, min_iou=0.3, max_missed=15):
+        self.min_iou = min_iou
+        self.max_missed = max_missed
+        self.tracks = {}  # id -> [bbox, missed frames]
+        self.next_id = 0
+        self.retired = []
+
+    def reset(self):
+        self.tracks = {}
+        self.next_id = 0
+        self.retired = []
+
+    def assign(self, bboxes):
+        """Return one face ID per box, in the same order"""
+        pairs = sorted(
+            ((iou(track[0], bbox), face_id, index)
+             for face_id, track in self.tracks.items() for index, bbox in enumerate(bboxes)),
+            reverse=True,
+        )
+        ids = [None] * len(bboxes)
+        matched = set()
+        for overlap, face_id, index in pairs:
+            if overlap < self.min_iou:
+                break
+            if face_id in matched or ids[index] is not None:
+                continue
+            ids[index] = face_id
+            matched.add(face_id)
+
+        for index, bbox in enumerate(bboxes):
+            if ids[index] is None:
+                ids[index] = self.next_id
+                self.next_id += 1
+            self.tracks[ids[index]] = [bbox, 0]
+
+        self.retired = []
+        for face_id in list(self.tracks):
+            if face_id not in ids:
+                self.tracks[face_id][1] += 1
+                if self.tracks[face_id][1] > self.max_missed:
+                    del self.tracks[face_id]
+                    self.retired.append(face_id)
+        return ids
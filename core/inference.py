@@ -0,0 +1,153 @@
+import copy
+import json
+import os
+import torch
+
+BACKENDS = ("eager", "torchscript", "onnx")
+ARTIFACT_EXTENSIONS = {"torchscript": ".ts", "onnx": ".onnx"}
+
+
+class EagerBackend:
+    """Runs the PyTorch module as is."""
+    name = "eager"
+
+    def __init__(self, module):
+        self.module = module.eval()
+
+    def __call__(self, x):
+        with torch.no_grad():
+            outputs = self.module(x)
+        return outputs if isinstance(outputs, tuple) else (outputs,)
+
+
+class TorchScriptBackend:
+    """Runs a frozen TorchScript graph."""
+    name = "torchscript"
+
+    def __init__(self, path, device):
+        self.module = torch.jit.load(path, map_location=device).eval()
+
+    def __call__(self, x):
+        with torch.no_grad():
+            outputs = self.module(x)
+        return outputs if isinstance(outputs, tuple) else (outputs,)
+
+
+class OnnxBackend:
+    """Runs an exported ONNX graph through ONNX Runtime."""
+    name = "onnx"
+
+    def __init__(self, path, device):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError("The onnx inference backend requires the onnxruntime package") from e
+
+        providers = ["CPUExecutionProvider"]
+        if device.type == "cuda" and "CUDAExecutionProvider" in ort.get_available_providers():
+            providers.insert(0, "CUDAExecutionProvider")
+        self.device = device
+        self.session = ort.InferenceSession(path, providers=providers)
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, x):
+        outputs = self.session.run(None, {self.input_name: x.detach().cpu().numpy()})
+        return tuple(torch.from_numpy(output).to(self.device) for output in outputs)
+
+
+def export(kind, module, example, path, output_names):
+    """Export an inference-ready module to TorchScript or ONNX at `path`"""
+    module = module.eval()
+    with torch.no_grad():
+        if kind == "torchscript":
+            traced = torch.jit.freeze(torch.jit.trace(module, example, strict=False))
+            torch.jit.save(traced, path)
+        elif kind == "onnx":
+            torch.onnx.export(
+                module, example, path,
+                input_names=["input"], output_names=list(output_names),
+                dynamic_axes={name: {0: "batch"} for name in ["input", *output_names]},
+                opset_version=17, do_constant_folding=True,
+            )
+
+
+def check_parity(reference, backend, example, atol=1e-3, rtol=1e-3):
+    """Raise if the backend's outputs drift from the eager module's on `example`"""
+    expected = EagerBackend(reference)(example)
+    actual = backend(example)
+    for index, (exp, act) in enumerate(zip(expected, actual)):
+        act = act.to(exp.device)
+        if not torch.allclose(exp, act, atol=atol, rtol=rtol):
+            diff = (exp - act).abs().max().item()
+            raise RuntimeError(f"{backend.name} backend output {index} differs from eager by {diff:.2e}")
+
+
+def file_fingerprint(*paths):
+    """Identity of the files that exist among `paths` (name, size, modification time), for `source`"""
+    stats = [(path, os.stat(path)) for path in paths if os.path.exists(path)]
+    return ";".join(f"{path}:{st.st_size}:{st.st_mtime_ns}" for path, st in stats) or None
+
+
+def _stamp(path, source):
+    st = os.stat(path)
+    return {"artifact": [st.st_size, st.st_mtime_ns], "source": source}
+
+
+def _checked(path, source):
+    """Whether the artifact at `path` already passed the parity check against the weights `source`"""
+    if source is None:
+        return False
+    try:
+        with open(path + ".parity") as f:
+            return json.load(f) == _stamp(path, source)
+    except (OSError, ValueError):
+        return False
+
+
+def _mark_checked(path, source):
+    if source is None:
+        return
+    try:
+        with open(path + ".parity", "w") as f:
+            json.dump(_stamp(path, source), f)
+    except OSError:
+        pass  # Read-only model directory: check again on the next start
+
+
+def load_backend(kind, module, artifact_base, example, output_names, prepare=None, device=torch.device("cpu"),
+                 source=None):
+    """Return a callable running `module` on the selected backend.
+
+    For "torchscript" and "onnx" the module (after `prepare`, e.g. BatchNorm
+    folding) is exported once to `artifact_base` + extension, next to the
+    weights, and reused on later starts. The backend is checked against the
+    eager module on `example` so a stale or broken artifact cannot change
+    results silently. `source` identifies the weights (e.g. file_fingerprint
+    of the checkpoint): once an artifact has passed against the same source
+    it is not checked again, which saves an eager pass per model at startup.
+    Without a source every load is checked.
+    """
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown inference backend {kind!r}, expected one of {BACKENDS}")
+    if kind == "eager":
+        return EagerBackend(module)
+
+    path = artifact_base + ARTIFACT_EXTENSIONS[kind]
+    cached = os.path.exists(path)
+    if not cached:
+        prepared = prepare(module) if prepare is not None else copy.deepcopy(module)
+        export(kind, prepared.cpu(), example.cpu(), path, output_names)
+
+    backend = TorchScriptBackend(path, device) if kind == "torchscript" else OnnxBackend(path, device)
+    if cached and _checked(path, source):
+        return backend
+    try:
+        check_parity(module, backend, example.to(device))
+    except RuntimeError:
+        if not cached:
+            raise
+        # Artifact exported from older weights: rebuild it once
+        os.remove(path)
+        return load_backend(kind, module, artifact_base, example, output_names, prepare, device, source)
+    _mark_checked(path, source)
+    return backend
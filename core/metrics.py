@@ -0,0 +1,192 @@
+import bisect
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from .stats import StreamingCounter
+
+# Upper bounds of the latency buckets, from 0.25 ms to 5 s; bounds at most 1.5x apart keep
+# interpolated quantiles within a few percent
+LATENCY_BUCKETS = tuple(ms / 1000 for ms in (
+    0.25, 0.5, 0.75, 1, 1.5, 2, 3, 4, 5, 7.5, 10, 15, 20, 30, 40, 50, 75,
+    100, 150, 200, 300, 400, 500, 750, 1000, 1500, 2000, 3000, 5000))
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram, as exposed by Prometheus.
+
+    Recording a sample is a bisect and a few additions, so it is cheap
+    enough to wrap every stage of every frame. Quantiles are estimated by
+    linear interpolation inside the bucket they fall in.
+    """
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def quantile(self, q):
+        """Estimated q-quantile in seconds (None before the first sample)"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower  # Beyond the last bound there is nothing to interpolate towards
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def snapshot(self):
+        """(bucket counts, count, sum): picklable, for merging histograms of other processes"""
+        with self._lock:
+            return list(self.counts), self.count, self.sum
+
+    def merge(self, snapshot):
+        counts, count, total = snapshot
+        with self._lock:
+            self.counts = [a + b for a, b in zip(self.counts, counts)]
+            self.count += count
+            self.sum += total
+
+    def summary(self):
+        """Count, mean and p50/p95/p99 in milliseconds"""
+        if self.count == 0:
+            return {"count": 0}
+        summary = {"count": self.count, "mean_ms": self.sum / self.count * 1000}
+        for q in QUANTILES:
+            summary[f"p{int(q * 100)}_ms"] = self.quantile(q) * 1000
+        return summary
+
+
+class StageTimings:
+    """Latency histograms keyed by stage name.
+
+    Samples are also forwarded to `parent`, so a session's own breakdown and
+    the process-wide one exposed at /metrics are filled by the same call.
+    """
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, LatencyHistogram())
+        histogram.observe(seconds)
+        if self.parent is not None:
+            self.parent.observe(stage, seconds)
+
+    @contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def summary(self):
+        return {stage: histogram.summary() for stage, histogram in list(self.histograms.items())}
+
+    def snapshot(self):
+        return {stage: histogram.snapshot() for stage, histogram in list(self.histograms.items())}
+
+    def merge(self, snapshot):
+        """Add the samples of another StageTimings' snapshot (not forwarded to `parent`)"""
+        for stage, histogram_snapshot in snapshot.items():
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, LatencyHistogram())
+            histogram.merge(histogram_snapshot)
+
+
+class Metrics:
+    """Process-wide server metrics, rendered in Prometheus text format"""
+    def __init__(self):
+        self.stages = StageTimings()    # Frame analysis stages, all sessions together
+        self.requests = StageTimings()  # HTTP handlers (and frames analyzed over WebSocket)
+        self.frames_total = 0
+        self.recent_frames = StreamingCounter(window_seconds=60)
+        self.dropped = Counter()        # reason -> frames
+        self.gauges = {}                # name -> (help text, callable returning the value)
+        self._lock = threading.Lock()
+
+    def frame_done(self):
+        with self._lock:
+            self.frames_total += 1
+            self.recent_frames.add("frames")
+
+    def drop(self, reason):
+        with self._lock:
+            self.dropped[reason] += 1
+
+    def gauge(self, name, help_text, fn):
+        self.gauges[name] = (help_text, fn)
+
+    def frames_per_second(self, seconds=10):
+        with self._lock:
+            return self.recent_frames.window(seconds)["frames"] / seconds
+
+    def render(self, stages=None):
+        """Prometheus text; `stages` replaces the stage timings of this process
+        (e.g. merged from worker processes)"""
+        lines = []
+        self._render_histograms(lines, "knowly_stage_seconds", "stage",
+                                "Time spent in each stage of frame analysis",
+                                self.stages if stages is None else stages)
+        self._render_histograms(lines, "knowly_request_seconds", "handler",
+                                "Time spent handling each request", self.requests)
+        lines += [
+            "# HELP knowly_frames_total Frames analyzed",
+            "# TYPE knowly_frames_total counter",
+            f"knowly_frames_total {self.frames_total}",
+            "# HELP knowly_frames_per_second Frames analyzed per second over the last 10 seconds",
+            "# TYPE knowly_frames_per_second gauge",
+            f"knowly_frames_per_second {self.frames_per_second():g}",
+            "# HELP knowly_frames_dropped_total Frames dropped before analysis",
+            "# TYPE knowly_frames_dropped_total counter",
+        ]
+        lines += [f'knowly_frames_dropped_total{{reason="{reason}"}} {count}'
+                  for reason, count in sorted(self.dropped.items())]
+        for name, (help_text, fn) in self.gauges.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {fn():g}"]
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(lines, name, label, help_text, timings):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        quantiles = []
+        for key, histogram in sorted(timings.histograms.items()):
+            with histogram._lock:
+                counts, count, total = list(histogram.counts), histogram.count, histogram.sum
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f'{name}_bucket{{{label}="{key}",le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{label}="{key}"}} {total:g}')
+            lines.append(f'{name}_count{{{label}="{key}"}} {count}')
+            for q in QUANTILES:
+                value = histogram.quantile(q)
+                if value is not None:
+                    quantiles.append(f'{name}_quantile{{{label}="{key}",quantile="{q:g}"}} {value:g}')
+        if quantiles:
+            lines += [f"# HELP {name}_quantile Estimated latency quantiles of {name}",
+                      f"# TYPE {name}_quantile gauge"] + quantiles
+
+
+# Shared by every session in the process and served at /metrics
+METRICS = Metrics()
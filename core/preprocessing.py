@@ -0,0 +1,58 @@
+import threading
+import torch
+import torch.nn.functional as F
+
+
+class TensorPreprocessor:
+    """Turns uint8 BGR face crops straight into a normalized float batch.
+
+    Replaces the BGR->RGB, PIL and torchvision / ViTImageProcessor round trips.
+    Each crop is resized once with antialiased bilinear interpolation, which
+    matches PIL's. Then BGR->RGB, rescaling and mean/std normalization happen
+    as one fused multiply-add into a per-thread buffer that is reused between
+    calls.
+
+    With `keep_aspect` the shorter side is resized to `size` and the result is
+    center-cropped (torchvision Resize + CenterCrop). Otherwise the crop is
+    resized straight to `size`.
+    """
+    def __init__(self, size, mean, std, rescale_factor=1 / 255, keep_aspect=False):
+        self.size = (size, size) if isinstance(size, int) else tuple(size)
+        self.keep_aspect = keep_aspect
+        std = torch.tensor(std, dtype=torch.float32)
+        self.weight = (rescale_factor / std).view(3, 1, 1)
+        self.bias = (-torch.tensor(mean, dtype=torch.float32) / std).view(3, 1, 1)
+        self._local = threading.local()
+
+    def __call__(self, face_imgs):
+        """Return a (N, 3, H, W) tensor; it is overwritten by this thread's next call"""
+        batch = self._buffer(len(face_imgs))
+        for i, face_img in enumerate(face_imgs):
+            resized = self._resize(face_img)
+            # Channels come out BGR; reading them reversed makes the output RGB
+            torch.addcmul(self.bias, resized[[2, 1, 0]], self.weight, out=batch[i])
+        return batch
+
+    def _buffer(self, n):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None or buffer.shape[0] < n:
+            buffer = torch.empty((n, 3) + self.size)
+            self._local.buffer = buffer
+        return buffer[:n]
+
+    def _resize(self, face_img):
+        height, width = face_img.shape[:2]
+        x = torch.from_numpy(face_img).permute(2, 0, 1).unsqueeze(0).float()
+        if not self.keep_aspect:
+            return F.interpolate(x, size=self.size, mode="bilinear", align_corners=False, antialias=True)[0]
+
+        crop_h, crop_w = self.size
+        short = min(crop_h, crop_w)
+        if width <= height:
+            new_w, new_h = short, int(short * height / width)
+        else:
+            new_h, new_w = short, int(short * width / height)
+        x = F.interpolate(x, size=(new_h, new_w), mode="bilinear", align_corners=False, antialias=True)[0]
+        top = int(round((new_h - crop_h) / 2.0))
+        left = int(round((new_w - crop_w) / 2.0))
+        return x[:, top:top + crop_h, left:left + crop_w]
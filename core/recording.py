@@ -0,0 +1,136 @@
+import json
+import os
+import queue
+import threading
+import numpy as np
+
+MAGIC = b"KNOWLYTS"
+HEADER_SIZE = 4096  # Magic, then the JSON header zero-padded to this size; records follow
+VERSION = 1
+
+# One fixed-width record per analyzed face (face_id -1: frame without a face)
+RECORD_DTYPE = np.dtype([
+    ("time", "<f8"),         # Unix time of the frame
+    ("frame", "<u4"),        # Frame number in the session
+    ("face_id", "<i4"),      # Only grows in multi-face mode, so long sessions need more than 16 bits
+    ("yaw", "<f4"),          # Head pose in degrees; NaN without a pose
+    ("pitch", "<f4"),
+    ("roll", "<f4"),
+    ("gaze_h", "<f4"),       # Gaze ratios; NaN when the pupils were not located
+    ("gaze_v", "<f4"),
+    ("orientation", "i1"),   # Label codes (index into the header's label lists), -1 for none
+    ("gaze", "i1"),
+    ("emotion", "i1"),
+    ("blink", "u1"),
+    ("focused", "u1"),
+])
+LABELS = {
+    "orientation": ["forward", "left", "right", "up", "down"],
+    "gaze": ["center", "left", "right"],
+    "emotion": ["Angry", "Disgust", "Fear", "Happy", "Neutral", "Sad", "Surprise", "Unknown"],
+}
+_CODES = {field: {label: code for code, label in enumerate(labels)} for field, labels in LABELS.items()}
+
+
+def encode_label(field, label):
+    return _CODES[field].get(label, -1)
+
+
+class TimeSeriesRecorder:
+    """Appends per-frame records to a binary file from a background thread.
+
+    `record` only puts rows on a bounded queue and never waits: when the
+    writer falls more than `max_pending` rows behind, new rows are counted in
+    `dropped` instead, as are the rows of a batch that cannot be written.
+    The writer packs what has accumulated into one RECORD_DTYPE array every
+    `flush_interval` seconds, so memory stays at one interval's worth of rows
+    however long the session runs.
+    """
+    def __init__(self, path, metadata=None, flush_interval=1.0, max_pending=4096):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._closing = threading.Event()
+        self._file = open(path, "wb")
+        self._file.write(self._header(metadata or {}))
+        self._file.flush()
+        self._thread = threading.Thread(target=self._run, name="timeseries-writer", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _header(metadata):
+        header = json.dumps({
+            "version": VERSION,
+            "dtype": [list(field) for field in RECORD_DTYPE.descr],
+            "labels": LABELS,
+            "metadata": metadata,
+        }).encode()
+        if len(MAGIC) + len(header) > HEADER_SIZE:
+            raise ValueError("Recording metadata does not fit in the header")
+        return MAGIC + header.ljust(HEADER_SIZE - len(MAGIC), b"\0")
+
+    def record(self, rows):
+        """Queue RECORD_DTYPE-ordered tuples for writing (never blocks)"""
+        if self._closing.is_set():
+            return
+        for row in rows:
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                self.dropped += 1
+
+    def _run(self):
+        while not self._closing.wait(self.flush_interval):
+            self._flush()
+        self._flush()
+        self._file.close()
+
+    def _flush(self):
+        rows = []
+        try:
+            while len(rows) < self._queue.maxsize:
+                rows.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        if not rows:
+            return
+        try:
+            self._file.write(np.array(rows, dtype=RECORD_DTYPE).tobytes())
+            self._file.flush()
+        except (OverflowError, ValueError, TypeError, OSError) as e:
+            # One bad batch must not stop the writer: count it and keep recording the rows after it
+            print(f"Recording {self.path}: dropped {len(rows)} rows ({type(e).__name__}: {e})")
+            self.dropped += len(rows)
+            return
+        self.written += len(rows)
+
+    def close(self):
+        """Write the queued rows and close the file"""
+        self._closing.set()
+        self._thread.join()
+
+    def summary(self):
+        return {"path": self.path, "records": self.written, "dropped": self.dropped}
+
+
+def load_recording(path):
+    """Memory-map a recording: returns (records, header), records being a
+    read-only RECORD_DTYPE array (a trailing partial record is ignored)"""
+    with open(path, "rb") as f:
+        head = f.read(HEADER_SIZE)
+    if len(head) < HEADER_SIZE or not head.startswith(MAGIC):
+        raise ValueError(f"{path} is not a time-series recording")
+    header = json.loads(head[len(MAGIC):].rstrip(b"\0"))
+    dtype = np.dtype([tuple(field) for field in header["dtype"]])
+    count = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+    if count == 0:
+        return np.empty(0, dtype), header
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,)), header
+
+
+def decode_labels(records, header, field):
+    """Label strings of a code column (None for -1)"""
+    labels = header["labels"][field]
+    return [labels[code] if code >= 0 else None for code in records[field]]
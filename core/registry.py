@@ -0,0 +1,139 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .config import MODEL_PATHS, BATCHING, POSE_ENGINE, POSE_ENGINES, STAGE_CONCURRENCY, WARMUP
+from .batching import MicroBatcher
+from .frame_context import FrameContext
+
+
+class ModelRegistry:
+    """Read-only set of models shared by every tracking session.
+
+    Loading dlib's shape predictor, Hopenet and the ViT emotion model is the
+    slow part of starting a session, so it happens once per process and each
+    session only keeps its own counters and calibration state. With batching
+    enabled, pose and emotion requests from concurrent sessions are grouped
+    into one forward pass per model. With stage concurrency enabled,
+    `stage_pool` runs the pose and emotion stages of a frame side by side.
+
+    The heavy libraries (dlib, torch, transformers) are only imported here,
+    while loading, and the time spent on each component is kept in
+    `load_timings` (seconds) so slow cold starts can be traced.
+    """
+    def __init__(self, landmarks_path=MODEL_PATHS["landmarks"], hopenet_path=MODEL_PATHS["hopenet"],
+                 batching=BATCHING, pose_engines=POSE_ENGINES, warmup=WARMUP, concurrency=STAGE_CONCURRENCY,
+                 default_pose_engine=POSE_ENGINE):
+        # Checked before anything loads: otherwise every session started with the default engine fails
+        if default_pose_engine not in pose_engines:
+            raise ValueError(f"Default pose engine {default_pose_engine!r} is not among the loaded engines "
+                             f"({', '.join(pose_engines)}); fix POSE_ENGINE or POSE_ENGINES in core/config.py")
+        self.load_timings = {}
+        self.face_detector = self._timed("face_detector", self._load_face_detector, landmarks_path)
+        self.head_orientation = None
+        if "hopenet" in pose_engines:
+            self.head_orientation = self._timed("hopenet", self._load_hopenet, hopenet_path)
+        self.emotion_detector = self._timed("emotion", self._load_emotion)
+        self.pose_engines = {}
+        if self.head_orientation is not None:
+            self.pose_engines["hopenet"] = self.head_orientation
+        if "pnp" in pose_engines:
+            self.pose_engines["pnp"] = self._timed("pnp", self._load_pnp)
+
+        self.pose_batcher = None
+        self.emotion_batcher = None
+        if batching["enabled"]:
+            if self.head_orientation is not None:
+                self.pose_batcher = MicroBatcher(
+                    self.head_orientation.estimate_pose_batch,
+                    batching["max_batch"], batching["max_wait_ms"], name="pose-batcher")
+            self.emotion_batcher = MicroBatcher(
+                self.emotion_detector.detect_emotion_batch,
+                batching["max_batch"], batching["max_wait_ms"], name="emotion-batcher")
+
+        self.stage_pool = None
+        if concurrency["enabled"]:
+            import torch
+            # Hopenet and the ViT may now run at the same time: split the cores between them
+            torch.set_num_threads(concurrency["torch_threads"] or max(1, (os.cpu_count() or 2) // 2))
+            self.stage_pool = ThreadPoolExecutor(concurrency["workers"], thread_name_prefix="analysis-stage")
+
+        if warmup:
+            self._timed("warmup", self.warmup)
+
+    def _timed(self, name, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        self.load_timings[name] = time.perf_counter() - start
+        return result
+
+    @staticmethod
+    def _load_face_detector(landmarks_path):
+        from .face_detector import FaceDetector
+        return FaceDetector(landmarks_path)
+
+    @staticmethod
+    def _load_hopenet(hopenet_path):
+        from modules.head_pose.orientation import HeadOrientation
+        return HeadOrientation(hopenet_path)
+
+    @staticmethod
+    def _load_pnp():
+        from modules.head_pose.pnp import PnPHeadOrientation
+        return PnPHeadOrientation()
+
+    @staticmethod
+    def _load_emotion():
+        from modules.emotion.emotion_detector import EmotionDetector
+        return EmotionDetector()
+
+    def warmup(self):
+        """Run a dummy frame and face through every model so the first real
+        frame does not pay for lazy kernel and allocator initialization"""
+        frame = np.full((480, 640, 3), 128, np.uint8)
+        face = np.full((160, 160, 3), 128, np.uint8)
+        self.face_detector.detect_faces(frame)
+        if self.head_orientation is not None:
+            self.head_orientation.estimate_pose_batch([face])
+        self.emotion_detector.detect_emotion_batch([face])
+
+    def check_pose_engine(self, engine):
+        if engine not in self.pose_engines:
+            raise ValueError(f"Pose engine {engine!r} is not loaded (available: {', '.join(self.pose_engines)})")
+
+    def estimate_poses(self, frame, faces, engine="hopenet"):
+        """Head pose for every face of a frame (or FrameContext); Hopenet crops share one forward pass"""
+        context = FrameContext.of(frame)
+        if engine != "hopenet":
+            return [self.pose_engines[engine].estimate_pose(context.frame, face["bbox"], face["landmarks"])
+                    for face in faces]
+        crops = [context.crop(face["bbox"]) for face in faces]
+        return self._run_batch(crops, self.head_orientation.estimate_pose_batch, self.pose_batcher)
+
+    def detect_emotions(self, face_imgs):
+        """Emotion for several faces with one forward pass"""
+        return self._run_batch(face_imgs, self.emotion_detector.detect_emotion_batch, self.emotion_batcher)
+
+    @staticmethod
+    def _run_batch(face_imgs, batch_fn, batcher):
+        """Run batch_fn on the non-empty crops (through the batcher when enabled), None for empty ones"""
+        valid = [i for i, face_img in enumerate(face_imgs) if face_img.size > 0]
+        results = [None] * len(face_imgs)
+        if not valid:
+            return results
+        if batcher is None:
+            outputs = batch_fn([face_imgs[i] for i in valid])
+        else:
+            # Submitted together, the crops land in the same micro-batch
+            futures = [batcher.submit(face_imgs[i]) for i in valid]
+            outputs = [future.result() for future in futures]
+        for i, output in zip(valid, outputs):
+            results[i] = output
+        return results
+
+    def close(self):
+        for batcher in (self.pose_batcher, self.emotion_batcher):
+            if batcher is not None:
+                batcher.close()
+        if self.stage_pool is not None:
+            self.stage_pool.shutdown()
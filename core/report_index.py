@@ -0,0 +1,213 @@
+"""SQLite index of the session reports.
+
+Every saved report is also added as one row here, so questions such as the
+average focus per day over the last month are one indexed SQL query
+instead of parsing every JSON file in session_reports/.
+
+Command line, from the repository root:
+    python -m core.report_index import                  # index existing report files once
+    python -m core.report_index aggregate --by day --days 30
+    python -m core.report_index sessions --since 2025-05-01
+"""
+import argparse
+import glob
+import json
+import os
+import sqlite3
+from contextlib import closing
+from datetime import date, timedelta
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    report_file TEXT PRIMARY KEY,
+    start_time TEXT NOT NULL,
+    end_time TEXT,
+    day TEXT NOT NULL,
+    duration_seconds REAL,
+    pose_engine TEXT,
+    faces_seen INTEGER,
+    focused_frames REAL,
+    total_frames INTEGER,
+    valid_frames INTEGER,
+    tracking_quality REAL,
+    focus_percentage REAL,
+    most_common_gaze TEXT,
+    blink_count INTEGER,
+    most_common_head_pose TEXT,
+    most_common_emotion TEXT
+);
+CREATE INDEX IF NOT EXISTS sessions_day ON sessions (day);
+CREATE INDEX IF NOT EXISTS sessions_start_time ON sessions (start_time);
+"""
+COLUMNS = ("report_file", "start_time", "end_time", "day", "duration_seconds", "pose_engine", "faces_seen",
+           "focused_frames", "total_frames", "valid_frames", "tracking_quality", "focus_percentage",
+           "most_common_gaze", "blink_count", "most_common_head_pose", "most_common_emotion")
+
+# SQL expression grouped on for each `aggregate(by=...)`
+GROUPS = {
+    "day": "day",
+    "week": "strftime('%Y-W%W', day)",
+    "month": "substr(day, 1, 7)",
+    "pose_engine": "pose_engine",
+    "gaze": "most_common_gaze",
+    "head_pose": "most_common_head_pose",
+    "emotion": "most_common_emotion",
+}
+
+
+def report_row(report, report_file):
+    """Index columns of a report; also reads reports written before the
+    summary keys lost their spaces ("gaze tracker", "head pose")"""
+    info = report["session_info"]
+    summary = report.get("analysis_summary", {})
+    gaze = summary.get("gaze_tracker", summary.get("gaze tracker", {}))
+    head_pose = summary.get("head_pose", summary.get("head pose", {}))
+    emotion = summary.get("emotion", {})
+    focus = report.get("focus_analysis", {})
+    return (
+        report_file, info["start_time"], info.get("end_time"), info["start_time"][:10],
+        info.get("duration_seconds"), info.get("pose_engine"), info.get("faces_seen"),
+        focus.get("focused_frames"), focus.get("total_frames"), focus.get("valid_frames"),
+        focus.get("tracking_quality"), focus.get("focus_percentage"),
+        gaze.get("most_common_gaze"), gaze.get("blink_count"),
+        head_pose.get("most_common_head_pose"), emotion.get("most_common_emotion"),
+    )
+
+
+class ReportIndex:
+    """Session report index stored next to the reports (`reports_dir/index.sqlite`).
+
+    Connections are opened per call, so sessions closing on different
+    threads can add their reports at the same time.
+    """
+    def __init__(self, reports_dir="session_reports", filename="index.sqlite"):
+        self.reports_dir = reports_dir
+        self.path = os.path.join(reports_dir, filename)
+        os.makedirs(reports_dir, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add(self, report, report_path):
+        """Index (or re-index) one saved report"""
+        self._insert([report_row(report, os.path.relpath(report_path, self.reports_dir))], replace=True)
+
+    def _insert(self, rows, replace=False):
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.executemany(
+                f"{verb} INTO sessions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", rows)
+            return cursor.rowcount
+
+    def import_reports(self):
+        """Index every report file of the directory not indexed yet; returns (added, skipped files)"""
+        with closing(self._connect()) as conn:
+            known = {row[0] for row in conn.execute("SELECT report_file FROM sessions")}
+        rows, skipped = [], []
+        for path in sorted(glob.glob(os.path.join(self.reports_dir, "*.json"))):
+            report_file = os.path.relpath(path, self.reports_dir)
+            if report_file in known:
+                continue
+            try:
+                with open(path) as f:
+                    rows.append(report_row(json.load(f), report_file))
+            except (OSError, ValueError, KeyError, TypeError):
+                skipped.append(report_file)
+        return (self._insert(rows) if rows else 0), skipped
+
+    @staticmethod
+    def _where(since, until, pose_engine):
+        clauses, params = [], []
+        if since:
+            clauses.append("day >= ?")
+            params.append(since)
+        if until:
+            clauses.append("day <= ?")
+            params.append(until)
+        if pose_engine:
+            clauses.append("pose_engine = ?")
+            params.append(pose_engine)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def sessions(self, since=None, until=None, pose_engine=None, limit=None):
+        """Indexed sessions, newest first; since/until are inclusive YYYY-MM-DD days"""
+        where, params = self._where(since, until, pose_engine)
+        query = f"SELECT * FROM sessions{where} ORDER BY start_time DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with closing(self._connect()) as conn:
+            return [dict(row) for row in conn.execute(query, params)]
+
+    def aggregate(self, by="day", since=None, until=None, pose_engine=None):
+        """Session count, average focus/tracking quality/duration and frame totals per group"""
+        if by not in GROUPS:
+            raise ValueError(f"Cannot group by {by!r}, expected one of {', '.join(GROUPS)}")
+        where, params = self._where(since, until, pose_engine)
+        query = f"""
+            SELECT {GROUPS[by]} AS grp, COUNT(*) AS sessions,
+                   AVG(focus_percentage) AS avg_focus_percentage,
+                   AVG(tracking_quality) AS avg_tracking_quality,
+                   AVG(duration_seconds) AS avg_duration_seconds,
+                   SUM(duration_seconds) AS total_duration_seconds,
+                   SUM(total_frames) AS total_frames
+            FROM sessions{where} GROUP BY grp ORDER BY grp"""
+        with closing(self._connect()) as conn:
+            rows = [dict(row) for row in conn.execute(query, params)]
+        for row in rows:
+            row[by] = row.pop("grp")
+        return rows
+
+
+def _print_table(rows, columns):
+    print("  ".join(f"{column:>22}" for column in columns))
+    for row in rows:
+        print("  ".join(f"{row[column]:>22.2f}" if isinstance(row[column], float) else f"{str(row[column]):>22}"
+                        for column in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the session report index")
+    parser.add_argument("--reports-dir", default="session_reports")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("import", help="index report files that are not indexed yet")
+    for name in ("aggregate", "sessions"):
+        command = commands.add_parser(name)
+        command.add_argument("--since", help="first day (YYYY-MM-DD)")
+        command.add_argument("--until", help="last day (YYYY-MM-DD)")
+        command.add_argument("--days", type=int, help="only the last N days (overrides --since)")
+        command.add_argument("--pose-engine")
+        command.add_argument("--json", action="store_true", help="print JSON instead of a table")
+        if name == "aggregate":
+            command.add_argument("--by", choices=list(GROUPS), default="day")
+        else:
+            command.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    index = ReportIndex(args.reports_dir)
+    if args.command == "import":
+        added, skipped = index.import_reports()
+        print(f"Indexed {added} report(s) into {index.path}")
+        for report_file in skipped:
+            print(f"Skipped unreadable report {report_file}")
+        return
+
+    since = (date.today() - timedelta(days=args.days - 1)).isoformat() if args.days else args.since
+    if args.command == "aggregate":
+        rows = index.aggregate(args.by, since, args.until, args.pose_engine)
+        columns = [args.by, "sessions", "avg_focus_percentage", "avg_tracking_quality", "total_duration_seconds"]
+    else:
+        rows = index.sessions(since, args.until, args.pose_engine, args.limit)
+        columns = ["start_time", "duration_seconds", "focus_percentage", "most_common_emotion", "report_file"]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        _print_table(rows, columns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import time
+from collections import Counter
+
+
+class StreamingCounter:
+    """Running label counts plus a ring of fixed-width time buckets.
+
+    Replaces per-frame label lists: memory is one entry per distinct label for
+    the running totals and `window_seconds / bucket_seconds` small histograms
+    for recent history, however long the session runs. `window(seconds)`
+    answers "what happened in the last N seconds" by summing at most that
+    many buckets.
+    """
+    def __init__(self, window_seconds=600, bucket_seconds=1.0, clock=time.monotonic):
+        self.bucket_seconds = bucket_seconds
+        self.window_seconds = window_seconds
+        self.clock = clock
+        self.counts = Counter()
+        self.total = 0
+        nb_buckets = max(1, int(window_seconds / bucket_seconds))
+        self._buckets = [Counter() for _ in range(nb_buckets)]
+        self._bucket_ids = [-1] * nb_buckets
+
+    @classmethod
+    def merged(cls, counters):
+        """Running totals of several counters combined (without their time buckets)"""
+        result = cls(window_seconds=1)
+        for counter in counters:
+            result.counts.update(counter.counts)
+            result.total += counter.total
+        return result
+
+    def __len__(self):
+        """Number of distinct labels, like Counter (`total` is the weighted count, possibly a float)"""
+        return len(self.counts)
+
+    def __bool__(self):
+        return self.total > 0
+
+    def __getitem__(self, label):
+        return self.counts[label]
+
+    def add(self, label, weight=1):
+        self.counts[label] += weight
+        self.total += weight
+
+        bucket_id = int(self.clock() / self.bucket_seconds)
+        slot = bucket_id % len(self._buckets)
+        if self._bucket_ids[slot] != bucket_id:
+            self._buckets[slot].clear()
+            self._bucket_ids[slot] = bucket_id
+        self._buckets[slot][label] += weight
+
+    def most_common(self):
+        """Most frequent label (first seen wins ties, like Counter.most_common), or None"""
+        if not self.counts:
+            return None
+        return self.counts.most_common(1)[0][0]
+
+    def window(self, seconds):
+        """Label counts over the last `seconds` (capped at window_seconds)"""
+        current = int(self.clock() / self.bucket_seconds)
+        nb_buckets = min(len(self._buckets), max(1, int(seconds / self.bucket_seconds)))
+        oldest = current - nb_buckets + 1
+        counts = Counter()
+        for bucket_id, bucket in zip(self._bucket_ids, self._buckets):
+            if oldest <= bucket_id <= current:
+                counts.update(bucket)
+        return counts
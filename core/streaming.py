@@ -0,0 +1,29 @@
+import asyncio
+
+
+class LatestFrameSlot:
+    """Single-slot mailbox between a WebSocket reader and the analysis loop.
+
+    A frame that arrives before the previous one was picked up replaces it
+    (latest frame wins), so a client sending faster than analysis keeps up
+    sees fresh results instead of a growing backlog.
+    """
+    def __init__(self):
+        self._item = None
+        self._ready = asyncio.Event()
+        self.dropped = 0
+
+    def put(self, seq, payload):
+        """Store a frame; returns True when it replaced one that was never analyzed"""
+        replaced = self._item is not None
+        if replaced:
+            self.dropped += 1
+        self._item = (seq, payload)
+        self._ready.set()
+        return replaced
+
+    async def get(self):
+        await self._ready.wait()
+        self._ready.clear()
+        item, self._item = self._item, None
+        return item
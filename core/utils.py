@@ -1,13 +1,19 @@
 import cv2
-from .config import SOURCE, VIDEO_PATH, CAMERA_ID
+from .capture import ThreadedCapture
+from .config import SOURCE, VIDEO_PATH, CAMERA_ID, CAPTURE
 
 
-def get_video_feed():
-    """Initialize and return video capture object based on config"""
+def get_video_feed(threaded=CAPTURE["threaded"]):
+    """Initialize and return video capture object based on config
+    (a ThreadedCapture with the same interface when threaded)"""
     if SOURCE == "realtime":
         cap = cv2.VideoCapture(CAMERA_ID)
+        if threaded:
+            cap = ThreadedCapture(cap, latest_only=True, buffer_size=CAPTURE["buffer_size"])
     elif SOURCE == "video":
         cap = cv2.VideoCapture(VIDEO_PATH)
+        if threaded:
+            cap = ThreadedCapture(cap, latest_only=False, buffer_size=CAPTURE["read_ahead"])
     return cap
 
 
@@ -1,9 +1,23 @@
+import argparse
 import cv2
+from core.config import ADAPTIVE_QUALITY
 from core.utils import get_video_feed
 from face_analyzer import FaceAnalyzer
 
+def primary_face(results):
+    """Results of the largest face when multi-face analysis nests them per face"""
+    if results and "faces" in results:
+        return max(results["faces"], key=lambda face: face["bbox"][2] * face["bbox"][3])
+    return results
+
 def main():
-    analyzer = FaceAnalyzer()
+    parser = argparse.ArgumentParser(description="Live child attention analysis")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="lower analysis quality when frames fall behind the target frame rate")
+    parser.add_argument("--target-fps", type=float, default=ADAPTIVE_QUALITY["target_fps"])
+    args = parser.parse_args()
+
+    analyzer = FaceAnalyzer(adaptive=args.adaptive, target_fps=args.target_fps)
     cap = get_video_feed()
     
     if not cap.isOpened():
@@ -24,6 +38,8 @@ def main():
             
             total_frames += 1    
             results, annotated_frame, focus = analyzer.analyze(frame)
+            nb_faces = len(results["faces"]) if results and "faces" in results else None
+            results = primary_face(results)
             
             # Count valid frames where we have either head or eye tracking
             if (results and (results["head_pose"] or 
@@ -53,10 +69,18 @@ def main():
                 if results["emotion"]:
                     cv2.putText(display_frame, f"Emotion: {results['emotion'].upper()}", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
                 
+                if nb_faces is not None:
+                    y_pos += 25
+                    cv2.putText(display_frame, f"Faces: {nb_faces}", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+
                 # Display tracking quality
                 tracking_quality = f"Tracking: {valid_frames}/{total_frames} frames ({valid_frames/total_frames*100:.1f}%)"
                 cv2.putText(display_frame, tracking_quality, (10, y_pos+25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 165, 0), 2)
 
+            if args.adaptive:
+                cv2.putText(display_frame, f"Quality: {analyzer.level['name']}", (10, display_frame.shape[0] - 15),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 165, 0), 2)
+
             cv2.imshow("Child Attention Analysis", display_frame)
             
             if cv2.waitKey(1) & 0xFF == ord('q'):
@@ -66,6 +90,8 @@ def main():
         cap.release()
         cv2.destroyAllWindows()
         
+        analyzer.stop_recording()
+
         # Pass tracking quality to analyzer
         analyzer.set_tracking_quality(valid_frames/total_frames if total_frames > 0 else 0)
         
@@ -75,6 +101,8 @@ def main():
             print(f"Session Duration: {report['session_info']['duration_seconds']:.2f} seconds")
             print(f"Focused: {report['focus_analysis']['focus_percentage']:.2f}%")
             print(f"Tracking Quality: {valid_frames}/{total_frames} frames ({valid_frames/total_frames*100:.1f}%)")
+            if getattr(cap, "latest_only", False):
+                print(f"Camera frames dropped while analyzing: {cap.dropped}/{cap.frames_read}")
         else:
             print("\nFailed to save session report")
 
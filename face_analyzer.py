@@ -1,128 +1,481 @@
 import cv2
 import json
+import math
 import os
+import time
+from collections import Counter
 from datetime import datetime
-from core.face_detector import FaceDetector
+from core.adaptive import AdaptiveQuality
+from core.config import (ADAPTIVE_QUALITY, FACE_TRACKING, MULTI_FACE, QUALITY_LEVELS, RECORDING, REPORT_INDEX, STAGE_CADENCE,
+                         STAGE_CACHE_MAX_MOTION, POSE_ENGINE)
+from core.frame_context import FrameContext
+from core.identity import FaceIdentityTracker
+from core.metrics import METRICS, StageTimings
+from core.recording import TimeSeriesRecorder, encode_label
+from core.registry import ModelRegistry
+from core.report_index import ReportIndex
+from core.stats import StreamingCounter
 from core.utils import preprocess_frame
-from modules.head_pose.orientation import HeadOrientation
 from modules.eye_tracking.gaze_tracker import GazeTracker
-from modules.emotion.emotion_detector import EmotionDetector
 
-class FaceAnalyzer:
-    def __init__(self):
-        self.face_detector = FaceDetector()
-        self.head_orientation = HeadOrientation()
+
+class FaceState:
+    """Everything tracked for one face: gaze calibration, cached stage results and summaries"""
+    def __init__(self, face_id):
+        self.face_id = face_id
         self.gaze_tracker = GazeTracker()
-        self.emotion_detector = EmotionDetector()
+        self.pose_stats = StreamingCounter()
+        self.emotion_stats = StreamingCounter()
+        self.focus_stats = StreamingCounter()  # "frames", "valid" and weighted "focus" per frame
+        self.stage_cache = {}  # stage -> (frame number, bbox, result)
+        self.focus_frames = 0
+        self.valid_frames = 0  # Frames where we have either head or eye tracking
+        self.total_frames = 0  # Frames this face was analyzed in
+
+    @property
+    def gaze_stats(self):
+        return self.gaze_tracker.gaze_stats
+
+
+class FaceSummary:
+    """Running totals of one or more faces that left the frame, without their
+    trackers, caches and time windows (a few label counts each)"""
+    def __init__(self, face_id=None):
+        self.face_id = face_id
+        self.faces = 0  # Faces folded in
+        self.gaze_stats = StreamingCounter.merged(())
+        self.pose_stats = StreamingCounter.merged(())
+        self.emotion_stats = StreamingCounter.merged(())
+        self.focus_frames = 0
+        self.valid_frames = 0
+        self.total_frames = 0
+
+    def add(self, state):
+        self.faces += 1
+        for name in ("gaze_stats", "pose_stats", "emotion_stats"):
+            setattr(self, name, StreamingCounter.merged((getattr(self, name), getattr(state, name))))
+        self.focus_frames += state.focus_frames
+        self.valid_frames += state.valid_frames
+        self.total_frames += state.total_frames
+
+
+class FaceAnalyzer:
+    def __init__(self, models=None, pose_engine=POSE_ENGINE, multi_face=MULTI_FACE["enabled"],
+                 record=RECORDING["enabled"], adaptive=False, target_fps=ADAPTIVE_QUALITY["target_fps"]):
+        # Models are shared read-only between sessions; everything below is per-session state
+        self.models = models if models is not None else ModelRegistry()
+        self.models.check_pose_engine(pose_engine)
+        self.pose_engine = pose_engine
+        self.active_pose_engine = pose_engine  # Differs from pose_engine while adaptive quality swaps it
+        self.face_detector = self.models.face_detector
+        self.head_orientation = self.models.head_orientation
+        self.emotion_detector = self.models.emotion_detector
+        self.timings = StageTimings(parent=METRICS.stages)  # Per-stage latency of this session
+        from core.face_detector import FaceTracker  # Imports dlib: only once models are in use, like the registry
+        self.face_tracker = FaceTracker(self.face_detector, **FACE_TRACKING, timings=self.timings)
+        # Without multi-face analysis only the first face is analyzed, always as face 0
+        self.identities = FaceIdentityTracker(MULTI_FACE["min_iou"], MULTI_FACE["max_missed"]) if multi_face else None
+        self.faces = {0: FaceState(0)} if not multi_face else {}  # face ID -> FaceState of faces in frame
+        self.retired_faces = {}  # face ID -> FaceSummary of faces that left after MULTI_FACE["min_report_frames"]
+        self.short_lived_faces = FaceSummary()  # Every other face that left, combined
+        self.stage_cadence = dict(STAGE_CADENCE)
         self.session_start = None
         self.session_end = None
         self.reports_dir = "session_reports"
         os.makedirs(self.reports_dir, exist_ok=True)
-        self.focus_frames = 0
+        self.report_index = None  # Opened by the first save_report, so analyzers that never save leave no index
         self.total_frames = 0
         self.tracking_quality = 1.0  # Default to perfect tracking
-        self.valid_frames = 0  # Frames where we have either head or eye tracking
+        self.record = record
+        self.recorder = None  # Per-frame time series of the current session when recording
+        # Adaptive quality: the controller picks a level from QUALITY_LEVELS after every frame
+        self.adaptive = adaptive
+        self.target_fps = target_fps
+        self.quality = None
+        self.level = QUALITY_LEVELS[0]
+        self.level_frames = Counter()  # level name -> frames
+        self.frames_seen = 0
+        self.skipped_frames = 0  # Frames answered with the previous results at a reduced analysis rate
+        self._last_analysis = None
+
+    @property
+    def multi_face(self):
+        return self.identities is not None
+
+    @property
+    def all_faces(self):
+        """States of the faces in frame and summaries of those that left"""
+        return [*self.faces.values(), *self.retired_faces.values(), self.short_lived_faces]
+
+    @property
+    def focus_frames(self):
+        return sum(state.focus_frames for state in self.all_faces)
+
+    @property
+    def valid_frames(self):
+        return sum(state.valid_frames for state in self.all_faces)
 
     def start_session(self):
         """Initialize a new tracking session"""
         self.session_start = datetime.now()
         self.session_end = None
-        self.focus_frames = 0
         self.total_frames = 0
-        self.valid_frames = 0
+        self.timings = self.face_tracker.timings = StageTimings(parent=METRICS.stages)
+        self.face_tracker.reset()
+        if self.multi_face:
+            self.identities.reset()
+            self.faces = {}
+        else:
+            self.faces = {0: FaceState(0)}
+        self.retired_faces = {}
+        self.short_lived_faces = FaceSummary()
+        self.quality = AdaptiveQuality(self.target_fps) if self.adaptive else None
+        self._apply_level(QUALITY_LEVELS[0])
+        self.level_frames = Counter()
+        self.frames_seen = 0
+        self.skipped_frames = 0
+        self._last_analysis = None
+        self.stop_recording()
+        if self.record:
+            os.makedirs(RECORDING["dir"], exist_ok=True)
+            path = os.path.join(RECORDING["dir"], f"session_{self.session_start.strftime('%Y%m%d_%H%M%S_%f')}.ts")
+            self.recorder = TimeSeriesRecorder(
+                path, {"start_time": self.session_start.isoformat(), "pose_engine": self.pose_engine},
+                RECORDING["flush_interval"], RECORDING["max_pending"])
+
+    def stop_recording(self):
+        """Write the rest of the time series and close it (no-op when not recording)"""
+        if self.recorder is not None:
+            self.recorder.close()
 
     def analyze(self, frame):
-        """Analyze frame for head pose, gaze, and emotion"""
+        """Analyze frame for head pose, gaze, and emotion.
+
+        Returns (result, annotated frame, focused). With multi-face analysis
+        the result is {"faces": [...]}, one entry per face with its "face_id"
+        and "bbox" next to the usual head_pose/gaze/emotion, and `focused`
+        maps face IDs to their focus flag. Otherwise both describe the first
+        face only.
+
+        With adaptive quality the frame's cost updates the controller, which
+        may switch the analysis to a cheaper or richer level for the next one.
+        """
+        start = time.perf_counter()
+        self.frames_seen += 1
+        interval = self.level.get("analysis_interval", 1)
+        if interval > 1 and self._last_analysis is not None and self.frames_seen % interval:
+            output = self._reuse_last_analysis(frame)
+            self.skipped_frames += 1
+        else:
+            with self.timings.time("analyze"):
+                output = self._analyze(frame)
+
+        if self.quality is not None:
+            self.level_frames[self.level["name"]] += 1
+            level = self.quality.update(time.perf_counter() - start)
+            if level is not None:
+                self._apply_level(level)
+        return output
+
+    def _apply_level(self, level):
+        """Switch detection resolution, emotion and pose engine to a quality level"""
+        self.level = level
+        self.face_tracker.detect_scale = min(FACE_TRACKING["detect_scale"], level.get("detect_scale", 1.0))
+        engine = level.get("pose_engine", self.pose_engine)
+        if engine not in self.models.pose_engines:
+            engine = self.pose_engine
+        if engine != self.active_pose_engine:
+            # Poses cached from the other engine should not stand in for this one
+            for state in self.faces.values():
+                state.stage_cache.pop("pose", None)
+            self.active_pose_engine = engine
+
+    def _reuse_last_analysis(self, frame):
+        """A frame skipped at a reduced analysis rate: previous results, drawn on the new frame"""
+        faces, states, output = self._last_analysis
         processed_frame = preprocess_frame(frame)
-        faces = self.face_detector.detect_faces(processed_frame)
-        
+        results = output[0]["faces"] if self.multi_face else [output[0]]
+        for face, state, result in zip(faces, states, results):
+            self._annotate(processed_frame, face, state, result["head_pose"])
+        return output[0], processed_frame, output[2]
+
+    def _analyze(self, frame):
+        with self.timings.time("preprocess"):
+            processed_frame = preprocess_frame(frame)
+        # Gray frame and face crops are made once here and shared by every stage
+        context = FrameContext(processed_frame)
+        faces = self.face_tracker.detect_faces(context)
+
         self.total_frames += 1
-        
+
+        if self.multi_face:
+            face_ids = self.identities.assign([face["bbox"] for face in faces])
+            for face_id in self.identities.retired:
+                self._retire(self.faces.pop(face_id))
+            for face_id in face_ids:
+                if face_id not in self.faces:
+                    self.faces[face_id] = FaceState(face_id)
+        else:
+            faces = faces[:1]
+            face_ids = [0] * len(faces)
+            self.faces[0].focus_stats.add("frames")
+
+        # Cached stage results only carry over while a face stays in frame
+        for face_id, state in self.faces.items():
+            if face_id not in face_ids:
+                state.stage_cache = {}
+
         if not faces:
+            self._last_analysis = None
+            self._record(face_ids, [], [])
             return None, processed_frame, None
 
-        face_data = faces[0]
-        bbox, landmarks, nose_tip = face_data["bbox"], face_data["landmarks"], face_data["nose_tip"]
-        x, y, w, h = bbox
+        states = [self.faces[face_id] for face_id in face_ids]
+        results, focused = self._analyze_faces(context, faces, states)
+        self._record(face_ids, results, focused)
 
-        # Head pose estimation
-        head_pose = self.head_orientation.estimate_pose(processed_frame, bbox)
-        if head_pose:
-            processed_frame = self.head_orientation.draw_axis(
-                processed_frame, head_pose["yaw"], head_pose["pitch"], 
-                head_pose["roll"], nose_tip[0], nose_tip[1], size=bbox[2]//2
-            )
-            cv2.rectangle(processed_frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
+        # Annotate a copy once every stage has seen the clean frame
+        with self.timings.time("draw"):
+            annotated_frame = processed_frame.copy()
+            for face, state, result in zip(faces, states, results):
+                self._annotate(annotated_frame, face, state, result["head_pose"])
+
+        if not self.multi_face:
+            output = results[0], annotated_frame, focused[0]
+        else:
+            for face_id, face, result in zip(face_ids, faces, results):
+                result["face_id"] = face_id
+                result["bbox"] = list(face["bbox"])
+            output = {"faces": results}, annotated_frame, dict(zip(face_ids, focused))
+        self._last_analysis = faces, states, output
+        return output
+
+    def _retire(self, state):
+        """Keep only the totals of a face whose ID was retired, so per-face state stays bounded by the
+        faces in frame however many come and go"""
+        if state.total_frames >= MULTI_FACE["min_report_frames"]:
+            self.retired_faces[state.face_id] = summary = FaceSummary(state.face_id)
+            summary.add(state)
+        else:
+            self.short_lived_faces.add(state)
+
+    def _analyze_faces(self, context, faces, states):
+        """Run every stage for the faces of one frame, each model once for all faces.
+
+        Pose, gaze and emotion only read the clean frame and the landmarks, so
+        with a stage pool the two models run on it while gaze runs here.
+        """
+        stages = {
+            # Head pose estimation
+            "pose": lambda: self._run_stage(
+                "pose", faces, states, lambda todo: self.models.estimate_poses(context, todo, self.active_pose_engine)),
+            # Emotion detection
+            "emotion": lambda: self._run_stage(
+                "emotion", faces, states,
+                lambda todo: self.models.detect_emotions([context.crop(face["bbox"]) for face in todo])),
+        }
+        if not self.level.get("emotion", True):
+            del stages["emotion"]  # Skipped at this quality level: no emotion is reported or counted
+        pool = self.models.stage_pool
+        if pool is not None:
+            futures = {stage: pool.submit(self._timed, stage, fn) for stage, fn in stages.items()}
 
         # Gaze tracking
-        gaze_dir = self.gaze_tracker.analyze(processed_frame, landmarks)
-        annotated_frame = self.gaze_tracker.annotated_frame()
+        gaze_dirs = []
+        for face, state in zip(faces, states):
+            with self.timings.time("gaze"):
+                gaze_dirs.append(state.gaze_tracker.analyze(context, face["landmarks"]))
 
-        # Emotion detection
-        face_img = processed_frame[y:y+h, x:x+w]
-        emotion = self.emotion_detector.detect_emotion(face_img) if face_img.size > 0 else None
-        
-        # Check if we have valid tracking data (either head pose or gaze)
-        has_valid_tracking = (head_pose is not None) or (self.gaze_tracker.pupils_located)
-        if has_valid_tracking:
-            self.valid_frames += 1
-        
-        # Determine if user is focused (looking forward and center)
-        forward_center = False
+        if pool is not None:
+            outputs = {stage: future.result() for stage, future in futures.items()}
+        else:
+            outputs = {stage: self._timed(stage, fn) for stage, fn in stages.items()}
+        outputs.setdefault("emotion", [None] * len(faces))
+
+        results, focused = [], []
+        for state, gaze_dir, head_pose, emotion in zip(states, gaze_dirs, outputs["pose"], outputs["emotion"]):
+            state.total_frames += 1
+            if self.multi_face:
+                state.focus_stats.add("frames")
+            if head_pose:
+                state.pose_stats.add(head_pose["orientation"])
+            if emotion:
+                state.emotion_stats.add(emotion)
+            gaze_tracker = state.gaze_tracker
+
+            # Check if we have valid tracking data (either head pose or gaze)
+            has_valid_tracking = (head_pose is not None) or (gaze_tracker.pupils_located)
+            if has_valid_tracking:
+                state.valid_frames += 1
+                state.focus_stats.add("valid")
+
+            forward_center, focus_weight = self._focus(head_pose, gaze_dir)
+            if forward_center:
+                state.focus_frames += focus_weight
+                state.focus_stats.add("focus", focus_weight)
+
+            focused.append(forward_center)
+            results.append({
+                "head_pose": head_pose,
+                "gaze": {
+                    "horizontal": gaze_tracker.horizontal_ratio() if gaze_tracker.pupils_located else None,
+                    "vertical": gaze_tracker.vertical_ratio() if gaze_tracker.pupils_located else None,
+                    "is_left": gaze_tracker.is_left(),
+                    "is_right": gaze_tracker.is_right(),
+                    "is_center": gaze_tracker.is_center(),
+                    "is_blinking": gaze_tracker.is_blinking()
+                },
+                "emotion": emotion
+            })
+        return results, focused
+
+    def _record(self, face_ids, results, focused):
+        """Hand this frame's rows to the recorder (a face_id -1 row when no face was found)"""
+        if self.recorder is None:
+            return
+        now = time.time()
+        if not results:
+            self.recorder.record([(now, self.total_frames, -1, math.nan, math.nan, math.nan,
+                                   math.nan, math.nan, -1, -1, -1, 0, 0)])
+            return
+        rows = []
+        for face_id, result, forward_center in zip(face_ids, results, focused):
+            pose = result["head_pose"] or {}
+            gaze = result["gaze"]
+            gaze_dir = "left" if gaze["is_left"] else "right" if gaze["is_right"] else "center" if gaze["is_center"] else None
+            rows.append((
+                now, self.total_frames, face_id,
+                pose.get("yaw", math.nan), pose.get("pitch", math.nan), pose.get("roll", math.nan),
+                math.nan if gaze["horizontal"] is None else gaze["horizontal"],
+                math.nan if gaze["vertical"] is None else gaze["vertical"],
+                encode_label("orientation", pose.get("orientation")), encode_label("gaze", gaze_dir),
+                encode_label("emotion", result["emotion"]), bool(gaze["is_blinking"]), forward_center,
+            ))
+        self.recorder.record(rows)
+
+    def _timed(self, stage, fn):
+        with self.timings.time(stage):
+            return fn()
+
+    @staticmethod
+    def _focus(head_pose, gaze_dir):
+        """Determine if the user is focused (looking forward and center) and how much that frame counts"""
         if head_pose and gaze_dir:
             # Full focus - both systems working and indicating attention
             if head_pose['orientation'] == 'forward' and gaze_dir == 'center':
-                forward_center = True
-                self.focus_frames += 1.0
+                return True, 1.0
             elif gaze_dir == 'center':
-                forward_center = True  # Still consider this focused
-                self.focus_frames += 0.7
-    
+                return True, 0.7  # Still consider this focused
+
         # If we only have head pose data
         elif head_pose and head_pose['orientation'] == 'forward':
-            forward_center = True
-            self.focus_frames += 0.7
-    
+            return True, 0.7
+
         # If we only have gaze data
         elif gaze_dir == 'center':
-            forward_center = True
-            self.focus_frames += 0.7
+            return True, 0.7
 
-    
-        return {
-            "head_pose": head_pose,
-            "gaze": {
-                "horizontal": self.gaze_tracker.horizontal_ratio() if self.gaze_tracker.pupils_located else None,
-                "vertical": self.gaze_tracker.vertical_ratio() if self.gaze_tracker.pupils_located else None,
-                "is_left": self.gaze_tracker.is_left(),
-                "is_right": self.gaze_tracker.is_right(),
-                "is_center": self.gaze_tracker.is_center(),
-                "is_blinking": self.gaze_tracker.is_blinking()
-            },
-            "emotion": emotion
-        }, annotated_frame, forward_center
+        return False, 0.0
+
+    def _annotate(self, frame, face, state, head_pose):
+        x, y, w, h = face["bbox"]
+        if head_pose:
+            nose_tip = face["nose_tip"]
+            self.models.pose_engines[self.active_pose_engine].draw_axis(
+                frame, head_pose["yaw"], head_pose["pitch"],
+                head_pose["roll"], nose_tip[0], nose_tip[1], size=w//2
+            )
+            cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
+        state.gaze_tracker.draw_pupils(frame)
+
+    def _run_stage(self, stage, faces, states, batch_fn):
+        """Run a stage on its cadence and reuse each face's last result in between.
+
+        Faces that are due are passed to `batch_fn` together, so the stage
+        runs once per frame however many faces need it. Cached results still
+        count once per frame in the summaries, exactly as if the stage had
+        run. A stage reruns early for a face whose box has moved or changed
+        size too much since its last run.
+        """
+        results = [None] * len(faces)
+        due = []
+        for i, (face, state) in enumerate(zip(faces, states)):
+            cached = state.stage_cache.get(stage)
+            if cached is not None:
+                last_frame, last_bbox, result = cached
+                if (self.total_frames - last_frame < self.stage_cadence.get(stage, 1)
+                        and not self._bbox_moved(last_bbox, face["bbox"])):
+                    results[i] = result
+                    continue
+            due.append(i)
+
+        if due:
+            for i, result in zip(due, batch_fn([faces[i] for i in due])):
+                results[i] = result
+                if result is not None:
+                    states[i].stage_cache[stage] = (self.total_frames, faces[i]["bbox"], result)
+        return results
+
+    @staticmethod
+    def _bbox_moved(old, new, max_motion=STAGE_CACHE_MAX_MOTION):
+        ox, oy, ow, oh = old
+        nx, ny, nw, nh = new
+        size = max(ow, oh, 1)
+        shift = max(abs((nx + nw / 2) - (ox + ow / 2)), abs((ny + nh / 2) - (oy + oh / 2)))
+        resize = abs(nw - ow) / max(ow, 1)
+        return shift / size > max_motion or resize > max_motion
 
     def set_tracking_quality(self, quality):
         """Store the tracking quality for reporting"""
         self.tracking_quality = quality
 
-    def get_summaries(self):
-        """Return all summaries in one dictionary"""
+    def get_summaries(self, states=None):
+        """Return all summaries in one dictionary (every face combined by default)"""
+        states = self.all_faces if states is None else states
         return {
-            "gaze_tracker": self.gaze_tracker.get_gaze_summary(),
-            "head_pose": self.head_orientation.get_pose_summary(),
-            "emotion": self.emotion_detector.get_emotion_summary(),
+            "gaze_tracker": GazeTracker.summarize(
+                StreamingCounter.merged(state.gaze_stats for state in states)),
+            "head_pose": self.models.pose_engines[self.pose_engine].get_pose_summary(
+                StreamingCounter.merged(state.pose_stats for state in states)),
+            "emotion": self.models.emotion_detector.get_emotion_summary(
+                StreamingCounter.merged(state.emotion_stats for state in states)),
         }
 
-    def calculate_focus_percentage(self):
+    def get_window_stats(self, seconds=60):
+        """Gaze, pose, emotion and focus over the last `seconds` of the session
+        (per face ID under "faces" with multi-face analysis, for the faces in frame)"""
+        states = list(self.faces.values())
+        window_seconds = min(seconds, states[0].focus_stats.window_seconds) if states else seconds
+        if not self.multi_face:
+            return {"window_seconds": window_seconds, **self._window_stats(self.faces[0], seconds)}
+        return {
+            "window_seconds": window_seconds,
+            "faces": {face_id: self._window_stats(state, seconds) for face_id, state in self.faces.items()},
+        }
+
+    @staticmethod
+    def _window_stats(state, seconds):
+        focus = state.focus_stats.window(seconds)
+        return {
+            "frames": focus["frames"],
+            "valid_frames": focus["valid"],
+            "focus_percentage": focus["focus"] / focus["valid"] * 100 if focus["valid"] else 0,
+            "gaze": dict(state.gaze_tracker.gaze_stats.window(seconds)),
+            "head_pose": dict(state.pose_stats.window(seconds)),
+            "emotion": dict(state.emotion_stats.window(seconds)),
+        }
+
+    def calculate_focus_percentage(self, focus_frames=None, valid_frames=None):
         """Calculate focus percentage with compensation for tracking quality"""
+        focus_frames = self.focus_frames if focus_frames is None else focus_frames
+        valid_frames = self.valid_frames if valid_frames is None else valid_frames
         if self.total_frames == 0:
             return 0
             
-        if self.valid_frames == 0:
+        if valid_frames == 0:
             return 0
         # Calculate raw focus percentage
-        raw_focus = (self.focus_frames / self.valid_frames) * 100
+        raw_focus = (focus_frames / valid_frames) * 100
         
         # Adjust focus calculation based on tracking quality
         if self.tracking_quality < 0.5:
@@ -135,21 +488,30 @@ class FaceAnalyzer:
         return adjusted_focus
 
     def generate_report(self):
-        """Generate session report with timing and summaries"""
+        """Generate session report with timing and summaries.
+
+        With multi-face analysis the top-level summaries combine every face,
+        and "faces" holds the same summaries for each face ID except faces
+        that left after fewer than MULTI_FACE["min_report_frames"] frames. "performance"
+        gives the latency of each stage over the session (count, mean and
+        p50/p95/p99 in milliseconds).
+        """
         if not self.session_start:
             return None
 
         self.session_end = datetime.now()
+        duration = (self.session_end - self.session_start).total_seconds()
         
         # Calculate tracking quality
         if not hasattr(self, 'tracking_quality'):
             self.tracking_quality = self.valid_frames / self.total_frames if self.total_frames > 0 else 0
 
-        return {
+        report = {
             "session_info": {
                 "start_time": self.session_start.isoformat(),
                 "end_time": self.session_end.isoformat(),
-                "duration_seconds": (self.session_end - self.session_start).total_seconds()
+                "duration_seconds": duration,
+                "pose_engine": self.pose_engine
             },
             "analysis_summary": self.get_summaries(),
             "focus_analysis": {
@@ -158,20 +520,56 @@ class FaceAnalyzer:
                 "valid_frames": self.valid_frames,
                 "tracking_quality": self.tracking_quality,
                 "focus_percentage": self.calculate_focus_percentage()
+            },
+            "performance": {
+                "frames_per_second": self.total_frames / duration if duration > 0 else 0,
+                "stages": self.timings.summary()
             }
         }
+        if self.quality is not None:
+            # Lower levels trade accuracy for speed; focus metrics should be read with this in mind
+            report["adaptive_quality"] = {
+                "target_fps": self.quality.target_fps,
+                "final_level": self.level["name"],
+                "level_changes": self.quality.changes,
+                "frames_per_level": dict(self.level_frames),
+                "skipped_frames": self.skipped_frames
+            }
+        if self.recorder is not None:
+            report["recording"] = self.recorder.summary()
+        if self.multi_face:
+            report["session_info"]["faces_seen"] = self.identities.next_id
+            report["session_info"]["short_lived_faces"] = self.short_lived_faces.faces
+            report["faces"] = {
+                str(face_id): {
+                    "analysis_summary": self.get_summaries([state]),
+                    "focus_analysis": {
+                        "focused_frames": state.focus_frames,
+                        "total_frames": state.total_frames,
+                        "valid_frames": state.valid_frames,
+                        "focus_percentage": self.calculate_focus_percentage(state.focus_frames, state.valid_frames)
+                    }
+                }
+                for face_id, state in sorted({**self.faces, **self.retired_faces}.items())
+            }
+        return report
 
     def save_report(self, filename=None):
-        """Save the report to JSON file"""
+        """Save the report to JSON file and add it to the report index"""
         report = self.generate_report()
         if not report:
             return False
 
         if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # Microseconds keep sessions ending in the same second from overwriting each other
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
             filename = f"session_report_{timestamp}.json"
             
         filepath = os.path.join(self.reports_dir, filename)
         with open(filepath, 'w') as f:
             json.dump(report, f, indent=2)
-        return True
\ No newline at end of file
+        if REPORT_INDEX:
+            if self.report_index is None:
+                self.report_index = ReportIndex(self.reports_dir)
+            self.report_index.add(report, filepath)
+        return True
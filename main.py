@@ -1,45 +1,197 @@
-from fastapi import FastAPI, UploadFile, File
-from fastapi.responses import JSONResponse
-import threading
-import numpy as np
-import cv2
-from face_analyzer import FaceAnalyzer
+import argparse
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, UploadFile, File, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Match
+from core.config import CLUSTER, EXECUTOR, MULTI_FACE, POSE_ENGINE, RECORDING, SERVER
+from core.executor import FrameExecutor
+from core.metrics import METRICS
+from core.registry import ModelRegistry
+from core.streaming import LatestFrameSlot
+from sessions import SessionManager
 
-app = FastAPI()
+sessions = None
+executor = None
+cluster = None
 
-analyzer = None 
+
+@asynccontextmanager
+async def lifespan(app):
+    # Load every model once; sessions only hold their own per-session state
+    global sessions, executor, cluster
+    if SERVER["mode"] == "cluster":
+        # Worker processes own the models and sessions; frames are decoded here and handed over
+        from core.cluster import WorkerCluster
+        cluster = sessions = WorkerCluster()
+        print(f"{len(cluster.workers)} analysis workers ready")
+        # Threads here only decode and wait on workers: one per frame buffer keeps every worker busy
+        executor = FrameExecutor(cluster.capacity, cluster.capacity + EXECUTOR["max_pending"])
+        METRICS.gauge("knowly_workers", "Analysis worker processes running",
+                      lambda: sum(worker.alive for worker in cluster.workers) if cluster else 0)
+    else:
+        models = ModelRegistry()
+        timings = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in models.load_timings.items())
+        print(f"Models ready in {sum(models.load_timings.values()):.2f}s ({timings})")
+        sessions = SessionManager(models)
+        executor = FrameExecutor(EXECUTOR["max_workers"], EXECUTOR["max_pending"])
+    METRICS.gauge("knowly_active_sessions", "Tracking sessions in progress", lambda: len(sessions) if sessions else 0)
+    METRICS.gauge("knowly_pending_frames", "Frames running or queued on the worker pool",
+                  lambda: executor.pending if executor else 0)
+    yield
+    executor.shutdown()
+    if cluster is not None:
+        cluster.close()
+    else:
+        sessions.models.close()
+    sessions = executor = cluster = None
+
+
+app = FastAPI(lifespan=lifespan)
+
+def route_path(scope):
+    """Route template a request matched (e.g. "/process_frame/"), so metrics keep one series per handler"""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    start = time.perf_counter()
+    try:
+        return await call_next(request)
+    finally:
+        METRICS.requests.observe(route_path(request.scope), time.perf_counter() - start)
+
+@app.get("/metrics")
+def metrics():
+    """Stage latencies, frame rate, dropped frames and active sessions in Prometheus text format"""
+    stages = cluster.stage_timings() if cluster is not None else None
+    return PlainTextResponse(METRICS.render(stages), media_type="text/plain; version=0.0.4")
+
+@app.get("/health")
+def health():
+    return {"status": "ok", "active_sessions": len(sessions), "load_timings": sessions.load_timings}
 
 @app.post("/start_tracking/")
-def start_tracking():
-    global analyzer
-    analyzer = FaceAnalyzer()
-    analyzer.start_session()
-    return {"message": "Tracking session started"}
+def start_tracking(pose_engine: str = POSE_ENGINE, multi_face: bool = MULTI_FACE["enabled"],
+                   record: bool = RECORDING["enabled"]):
+    try:
+        session_id = sessions.start(pose_engine, multi_face, record)
+    except ValueError as e:
+        return {"error": str(e)}
+    return {"message": "Tracking session started", "session_id": session_id}
+
+def raw_shape_of(width, height, channels):
+    """(width, height, channels) when a client declared a raw frame, else None for encoded images"""
+    if width is None or height is None:
+        return None
+    return width, height, channels
 
 @app.post("/process_frame/")
-async def process_frame(file: UploadFile = File(...)):
-    global analyzer
-    if analyzer is None:
+async def process_frame(session_id: str, file: UploadFile = File(...),
+                        width: int = None, height: int = None, channels: int = 3):
+    """Analyze one frame: an encoded image, or raw BGR/grayscale pixels when width and height are given"""
+    session = sessions.get(session_id)
+    if session is None:
         return {"error": "Tracking session not started"}
 
-   
     contents = await file.read()
-    nparr = np.frombuffer(contents, np.uint8)
-    frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    
-    result, _, _ = analyzer.analyze(frame)
-    if result is None:
-        return {"message": "No face detected in frame"}
 
-    return result 
+    # Decoding and inference run on the worker pool, in order per session; when it is full the frame is dropped
+    future = executor.submit(session.process_frame, contents, raw_shape_of(width, height, channels),
+                             key=session_id)
+    if future is None:
+        METRICS.drop("busy")
+        return JSONResponse(status_code=503, content={"status": "dropped", "reason": "busy"})
+
+    return await asyncio.wrap_future(future)
+
+@app.websocket("/stream/{session_id}")
+async def stream_frames(websocket: WebSocket, session_id: str,
+                        width: int = None, height: int = None, channels: int = 3):
+    """Continuous analysis over one connection.
+
+    Each binary message is a 4-byte big-endian sequence number followed by an
+    encoded image, or by raw pixels when width and height are given in the
+    connection URL. Every analyzed frame is answered with a JSON message
+    {"seq", "result", "dropped"}, where result is what /process_frame/ returns
+    and dropped counts frames replaced by newer ones before analysis.
+    """
+    await websocket.accept()
+    session = sessions.get(session_id)
+    if session is None:
+        await websocket.send_json({"error": "Tracking session not started"})
+        await websocket.close()
+        return
+
+    slot = LatestFrameSlot()
+    raw_shape = raw_shape_of(width, height, channels)
+
+    async def receive():
+        while True:
+            message = await websocket.receive_bytes()
+            if len(message) <= 4:
+                await websocket.send_json({"error": "Expected a 4-byte sequence number followed by an image"})
+                continue
+            if slot.put(int.from_bytes(message[:4], "big"), message[4:]):
+                METRICS.drop("superseded")
+
+    async def analyze():
+        while True:
+            seq, contents = await slot.get()
+            start = time.perf_counter()
+            future = executor.submit(session.process_frame, contents, raw_shape, key=session_id)
+            if future is None:
+                METRICS.drop("busy")
+                await websocket.send_json({"seq": seq, "status": "dropped", "reason": "busy", "dropped": slot.dropped})
+                continue
+            result = await asyncio.wrap_future(future)
+            METRICS.requests.observe("/stream/{session_id}", time.perf_counter() - start)
+            await websocket.send_json({"seq": seq, "result": result, "dropped": slot.dropped})
+
+    # Both loops run until the client disconnects or something fails
+    tasks = [asyncio.create_task(receive()), asyncio.create_task(analyze())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+    for task in done:
+        error = task.exception()
+        if error is not None and not isinstance(error, WebSocketDisconnect):
+            raise error
+
+@app.get("/session_stats/")
+def session_stats(session_id: str, seconds: float = 60):
+    session = sessions.get(session_id)
+    if session is None:
+        return {"error": "Tracking session not started"}
+
+    return session.window_stats(seconds)
 
 @app.post("/stop_tracking/")
-def stop_tracking():
-    global analyzer
-    if analyzer is None:
+def stop_tracking(session_id: str):
+    report = sessions.stop(session_id)
+    if report is None:
         return {"error": "No active session to stop"}
 
-    report = analyzer.generate_report()
-    analyzer.save_report()
-    analyzer = None 
     return JSONResponse(content=report)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Knowly tracking server")
+    parser.add_argument("--host", default=SERVER["host"])
+    parser.add_argument("--port", type=int, default=SERVER["port"])
+    parser.add_argument("--mode", choices=("single", "cluster"), default=SERVER["mode"])
+    parser.add_argument("--workers", type=int, help="analysis worker processes in cluster mode (default: one per core)")
+    args = parser.parse_args()
+    SERVER["mode"] = args.mode
+    if args.workers:
+        CLUSTER["workers"] = args.workers
+    uvicorn.run(app, host=args.host, port=args.port)
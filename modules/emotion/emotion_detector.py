@@ -1,58 +1,84 @@
-import cv2
 import numpy as np
 from transformers import ViTForImageClassification, ViTImageProcessor #,ViTFeatureExtractor
 import torch
-from collections import Counter
+import os
+from core.config import INFERENCE_BACKEND
+from core.inference import load_backend
+from core.preprocessing import TensorPreprocessor
+
+
+class LogitsOnly(torch.nn.Module):
+    """ViTForImageClassification as a plain pixel_values -> logits module, for export."""
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values):
+        return self.model(pixel_values=pixel_values).logits
+
+
 class EmotionDetector:
-    def __init__(self):
+    def __init__(self, backend=INFERENCE_BACKEND, artifacts_dir="trained_models", model=None, processor=None):
+        # `model` and `processor` replace the pretrained ones (e.g. a randomly initialized ViT offline)
         self.model_name = "trpakov/vit-face-expression"
         try:
-            self.processor = ViTImageProcessor.from_pretrained(self.model_name)
-            self.model = ViTForImageClassification.from_pretrained(self.model_name)
+            self.processor = processor if processor is not None else ViTImageProcessor.from_pretrained(self.model_name)
+            self.model = model if model is not None else ViTForImageClassification.from_pretrained(self.model_name)
+            self.model.eval()
         except Exception as e:
             raise RuntimeError(f"Model loading error: {e}")
+        # Same resize and normalization as the ViT processor, without its PIL and numpy copies
+        self.preprocess = TensorPreprocessor(
+            (self.processor.size["height"], self.processor.size["width"]),
+            mean=self.processor.image_mean, std=self.processor.image_std,
+            rescale_factor=self.processor.rescale_factor
+        )
+        height, width = self.preprocess.size
+        self.runner = load_backend(
+            backend, LogitsOnly(self.model),
+            os.path.join(artifacts_dir, self.model_name.split("/")[-1]),
+            example=torch.randn(2, 3, height, width), output_names=("logits",),
+            # The Hub revision identifies the pretrained weights
+            source=None if model is not None else getattr(self.model.config, "_commit_hash", None)
+        )
         
         self.emotion_labels = {
             0: "Angry", 1: "Disgust", 2: "Fear", 3: "Happy",
             4: "Neutral", 5: "Sad", 6: "Surprise"
         }
-        self.emotion_list = []  # Track emotions for summary
 
     def detect_emotion(self, face_img):
         """Detect emotion from a face image."""
         if face_img is None or face_img.size == 0:
             print("face_img is empty or None")
             return None
+        return self.detect_emotion_batch([face_img])[0]
 
+    def detect_emotion_batch(self, face_imgs):
+        """Detect emotions for several face images with one forward pass."""
         try:
-            # Convert BGR to RGB
-            rgb_img = cv2.cvtColor(face_img, cv2.COLOR_BGR2RGB)
-            # Process image for ViT model
-            inputs = self.processor(images=rgb_img, return_tensors="pt")
+            # Resize and normalize the BGR crops for the ViT model
+            pixel_values = self.preprocess(face_imgs)
             
             # Run inference
             with torch.no_grad():
-                outputs = self.model(**inputs)
-                logits = outputs.logits
-                predicted_class = torch.argmax(logits, dim=1).item()
-            
-            # Get emotion label
-            emotion = self.emotion_labels.get(predicted_class, "Unknown")
-            self.emotion_list.append(emotion)  # Store for summary
+                logits = self.runner(pixel_values)[0]
+                predicted_classes = torch.argmax(logits, dim=1).tolist()
             
-            return emotion
+            # Get emotion labels
+            return [self.emotion_labels.get(predicted_class, "Unknown") for predicted_class in predicted_classes]
         
         except Exception as e:
             print(f"Analysis error: {e}")
-            return None
+            return [None] * len(face_imgs)
 
-    def get_emotion_summary(self):
-        """Return a summary of detected emotions."""
-        if not self.emotion_list:
+    @staticmethod
+    def get_emotion_summary(emotion_stats):
+        """Return a summary of the emotions counted during a session."""
+        if not emotion_stats:
             return {"message": "No emotions detected"}
         
-        emotion_counter = Counter(self.emotion_list)
-        most_common_emotion = emotion_counter.most_common(1)[0][0]
+        most_common_emotion = emotion_stats.most_common()
         return {
             "most_common_emotion": most_common_emotion
         }
\ No newline at end of file
@@ -1,4 +1,5 @@
 import cv2
+import numpy as np
 from .pupil import Pupil
 
 
@@ -28,10 +29,15 @@ class Calibration:
     @staticmethod
     def find_best_threshold(eye_frame):
         average_iris_size = 0.48
+        # Filtering does not depend on the threshold, so it runs once. A binary threshold at t
+        # turns every pixel <= t black, so each trial's iris size is one cumulative histogram lookup
+        frame = Pupil.filter_frame(eye_frame)[5:-5, 5:-5]
+        height, width = frame.shape[:2]
+        nb_pixels = height * width
+        nb_blacks = np.cumsum(np.bincount(frame.ravel(), minlength=256))
         trials = {}
         for threshold in range(5, 100, 5):
-            iris_frame = Pupil.image_processing(eye_frame, threshold)
-            trials[threshold] = Calibration.iris_size(iris_frame)
+            trials[threshold] = int(nb_blacks[threshold]) / nb_pixels
         best_threshold, _ = min(trials.items(), key=lambda p: abs(p[1] - average_iris_size))
         return best_threshold
 
@@ -19,30 +19,31 @@ class Eye:
 
     @staticmethod
     def _middle_point(p1, p2):
-        return int((p1.x + p2.x) / 2), int((p1.y + p2.y) / 2)
+        return int((p1[0] + p2[0]) / 2), int((p1[1] + p2[1]) / 2)
 
     def _isolate(self, frame, landmarks, points):
-        region = np.array([(landmarks.part(point).x, landmarks.part(point).y) for point in points], dtype=np.int32)
+        region = landmarks[points]
         self.landmark_points = region
-        height, width = frame.shape[:2]
-        black_frame = np.zeros((height, width), np.uint8)
-        mask = np.full((height, width), 255, np.uint8)
-        cv2.fillPoly(mask, [region], (0, 0, 0))
-        eye = cv2.bitwise_not(black_frame, frame.copy(), mask=mask)
         margin = 5
         min_x = np.min(region[:, 0]) - margin
         max_x = np.max(region[:, 0]) + margin
         min_y = np.min(region[:, 1]) - margin
         max_y = np.max(region[:, 1]) + margin
-        self.frame = eye[min_y:max_y, min_x:max_x]
+        # Crop first and mask only the eye region: everything outside the eye polygon turns white
+        eye = frame[min_y:max_y, min_x:max_x].copy()
+        if eye.size:
+            mask = np.zeros(eye.shape[:2], np.uint8)
+            cv2.fillPoly(mask, [region - (min_x, min_y)], 255)
+            eye[mask == 0] = 255
+        self.frame = eye
         self.origin = (min_x, min_y)
         self.center = (self.frame.shape[1] / 2, self.frame.shape[0] / 2)
 
     def _blinking_ratio(self, landmarks, points):
-        left = (landmarks.part(points[0]).x, landmarks.part(points[0]).y)
-        right = (landmarks.part(points[3]).x, landmarks.part(points[3]).y)
-        top = self._middle_point(landmarks.part(points[1]), landmarks.part(points[2]))
-        bottom = self._middle_point(landmarks.part(points[5]), landmarks.part(points[4]))
+        left = landmarks[points[0]]
+        right = landmarks[points[3]]
+        top = self._middle_point(landmarks[points[1]], landmarks[points[2]])
+        bottom = self._middle_point(landmarks[points[5]], landmarks[points[4]])
         eye_width = math.hypot(left[0] - right[0], left[1] - right[1])
         eye_height = math.hypot(top[0] - bottom[0], top[1] - bottom[1])
         return eye_width / eye_height if eye_height != 0 else None
@@ -1,7 +1,8 @@
 import cv2
 from .eye import Eye
 from .calibration import Calibration
-from collections import Counter
+from core.frame_context import FrameContext
+from core.stats import StreamingCounter
 
 class GazeTracker:
     def __init__(self):
@@ -9,7 +10,7 @@ class GazeTracker:
         self.eye_left = None
         self.eye_right = None
         self.calibration = Calibration()
-        self.gaze_list=[]
+        self.gaze_stats = StreamingCounter()
 
     @property
     def pupils_located(self):
@@ -23,9 +24,11 @@ class GazeTracker:
 
     
     def analyze(self, frame, landmarks):
-        self.frame = frame
+        """Locate the pupils given the (68, 2) landmarks; `frame` may be a FrameContext"""
+        context = FrameContext.of(frame)
+        self.frame = context.frame
         gaze_dir=""
-        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray_frame = context.gray
         try:
             self.eye_left = Eye(gray_frame, landmarks, 0, self.calibration)
             self.eye_right = Eye(gray_frame, landmarks, 1, self.calibration)
@@ -33,18 +36,18 @@ class GazeTracker:
             # Track gaze direction when pupils are located
             if self.pupils_located:
                 if self.is_left():
-                    self.gaze_list.append("left")
+                    self.gaze_stats.add("left")
                     gaze_dir='left'
                 elif self.is_right():
-                    self.gaze_list.append("right")
+                    self.gaze_stats.add("right")
                     gaze_dir='right'
                 else:
-                    self.gaze_list.append("center")
+                    self.gaze_stats.add("center")
                     gaze_dir='center'
 
                 # Track blinking
                 if self.is_blinking():
-                    self.gaze_list.append("blink")
+                    self.gaze_stats.add("blink")
                     
         except Exception:
             self.eye_left = self.eye_right = None
@@ -56,15 +59,16 @@ class GazeTracker:
 
     def get_gaze_summary(self):
         """Return a summary of detected gaze directions."""
-        if not self.gaze_list:
+        return self.summarize(self.gaze_stats)
+
+    @staticmethod
+    def summarize(gaze_stats):
+        if not gaze_stats:
             return {"message": "No gaze data detected"}
-        
-        gaze_counter = Counter(self.gaze_list)
-        most_common_gaze = gaze_counter.most_common(1)[0][0]
 
         return {
-            "most_common_gaze": most_common_gaze,
-            "blink_count": gaze_counter.get("blink", 0)
+            "most_common_gaze": gaze_stats.most_common(),
+            "blink_count": gaze_stats["blink"]
         }
 
     def pupil_left_coords(self):
@@ -104,7 +108,9 @@ class GazeTracker:
             return blinking_ratio > 3.8
 
     def annotated_frame(self):
-        frame = self.frame.copy()
+        return self.draw_pupils(self.frame.copy())
+
+    def draw_pupils(self, frame):
         if self.pupils_located:
             color = (0, 255, 0)
             x_left, y_left = self.pupil_left_coords()
@@ -11,20 +11,43 @@ class Pupil:
         self.detect_iris(eye_frame)
 
     @staticmethod
-    def image_processing(eye_frame, threshold):
+    def filter_frame(eye_frame):
+        """Threshold-independent part of image_processing (smoothing and erosion)"""
         kernel = np.ones((3, 3), np.uint8)
         new_frame = cv2.bilateralFilter(eye_frame, 10, 15, 15)
-        new_frame = cv2.erode(new_frame, kernel=kernel, iterations=3)
+        return cv2.erode(new_frame, kernel=kernel, iterations=3)
+
+    @staticmethod
+    def image_processing(eye_frame, threshold):
+        new_frame = Pupil.filter_frame(eye_frame)
         _, new_frame = cv2.threshold(new_frame, threshold, 255, cv2.THRESH_BINARY)
         return new_frame
 
+    @staticmethod
+    def _second_largest(contours):
+        """Same pick as sorted(contours, key=cv2.contourArea)[-2], in one pass"""
+        largest = second = None
+        largest_area = second_area = -1.0
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            if area >= largest_area:
+                second, second_area = largest, largest_area
+                largest, largest_area = contour, area
+            elif area >= second_area:
+                second, second_area = contour, area
+        return second
+
     def detect_iris(self, eye_frame):
         self.iris_frame = self.image_processing(eye_frame, self.threshold)
-        contours, _ = cv2.findContours(self.iris_frame, cv2.RETR_TREE, cv2.CHAIN_APPROX_NONE)[-2:]
-        contours = sorted(contours, key=cv2.contourArea)
+        # Simple chains give the same polygon areas and moments with far fewer points.
+        # RETR_TREE is kept because its contour order decides ties between equal areas
+        contours, _ = cv2.findContours(self.iris_frame, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)[-2:]
+        pupil_contour = self._second_largest(contours)
+        if pupil_contour is None:
+            return
         try:
-            moments = cv2.moments(contours[-2])
+            moments = cv2.moments(pupil_contour)
             self.x = int(moments['m10'] / moments['m00'])
             self.y = int(moments['m01'] / moments['m00'])
-        except (IndexError, ZeroDivisionError):
-            pass
\ No newline at end of file
+        except ZeroDivisionError:
+            pass
@@ -1,5 +1,7 @@
+import copy
 import torch
 import torch.nn as nn
+from torch.nn.utils.fusion import fuse_conv_bn_eval
 import math
 
 
@@ -88,4 +90,25 @@ class Hopenet(nn.Module):
         pre_yaw = self.fc_yaw(x)
         pre_pitch = self.fc_pitch(x)
         pre_roll = self.fc_roll(x)
-        return pre_yaw, pre_pitch, pre_roll
\ No newline at end of file
+        return pre_yaw, pre_pitch, pre_roll
+
+def fuse_for_inference(model):
+    """Return an eval-mode copy of a Hopenet ready for export.
+
+    Every BatchNorm is folded into the convolution before it and the unused
+    `fc_finetune` head is dropped, so the exported graph is just convolutions
+    and the three angle heads.
+    """
+    model = copy.deepcopy(model).eval()
+    del model.fc_finetune
+    model.conv1 = fuse_conv_bn_eval(model.conv1, model.bn1)
+    model.bn1 = nn.Identity()
+    for layer in (model.layer1, model.layer2, model.layer3, model.layer4):
+        for block in layer:
+            block.conv1 = fuse_conv_bn_eval(block.conv1, block.bn1)
+            block.conv2 = fuse_conv_bn_eval(block.conv2, block.bn2)
+            block.conv3 = fuse_conv_bn_eval(block.conv3, block.bn3)
+            block.bn1 = block.bn2 = block.bn3 = nn.Identity()
+            if block.downsample is not None:
+                block.downsample = fuse_conv_bn_eval(block.downsample[0], block.downsample[1])
+    return model
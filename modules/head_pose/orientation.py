@@ -1,55 +1,92 @@
 import cv2
 import torch
 import numpy as np
-import torchvision.transforms as transforms
-from PIL import Image
 import math
-from .model import Hopenet, Bottleneck
-from collections import Counter
+import os
+from safetensors.torch import load_file, save_file
+from core.config import INFERENCE_BACKEND
+from core.inference import file_fingerprint, load_backend
+from core.preprocessing import TensorPreprocessor
+from .model import Hopenet, Bottleneck, fuse_for_inference
 
 
 class HeadOrientation:
-    def __init__(self, model_path="trained_models/hopenet_robust_alpha1.pkl"):
+    def __init__(self, model_path="trained_models/hopenet_robust_alpha1.pkl", backend=INFERENCE_BACKEND, model=None):
         self.device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
-        self.model = Hopenet(block=Bottleneck, layers=[3, 4, 6, 3], num_bins=66).to(self.device)
-        self.pose_list=[]
-        try:
-            self.model.load_state_dict(torch.load(model_path, map_location=self.device,weights_only=True))
-            self.model.eval()
-        except Exception as e:
-            raise RuntimeError(f"Failed to load model: {e}")
-        self.transform = transforms.Compose([
-            transforms.Resize(224),
-            transforms.CenterCrop(224),
-            transforms.ToTensor(),
-            transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-        ])
+        if model is not None:
+            # Already built Hopenet (e.g. randomly initialized for offline benchmarks)
+            self.model = model.to(self.device).eval()
+        else:
+            # Build on the meta device (no random init) and adopt the loaded tensors as parameters
+            with torch.device("meta"):
+                model = Hopenet(block=Bottleneck, layers=[3, 4, 6, 3], num_bins=66)
+            try:
+                model.load_state_dict(self._load_weights(model_path), assign=True)
+                self.model = model.to(self.device).eval()
+            except Exception as e:
+                raise RuntimeError(f"Failed to load model: {e}")
+        # Exported graphs (BatchNorm folded, fc_finetune dropped) are cached next to the weights
+        self.runner = load_backend(
+            backend, self.model, os.path.splitext(model_path)[0],
+            example=torch.randn(2, 3, 224, 224, device=self.device),
+            output_names=("yaw", "pitch", "roll"), prepare=fuse_for_inference, device=self.device,
+            source=None if model is not None else file_fingerprint(
+                model_path, os.path.splitext(model_path)[0] + ".safetensors")
+        )
+        # Resize(224) + CenterCrop(224) + ToTensor + Normalize, straight from the BGR crop
+        self.preprocess = TensorPreprocessor(
+            224, mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225], keep_aspect=True
+        )
         self.idx_tensor = torch.FloatTensor(list(range(66))).to(self.device)
 
-    def estimate_pose(self, frame, bbox):
+    @staticmethod
+    def _load_weights(model_path):
+        """Hopenet state dict, memory-mapped from a safetensors copy kept next to the pickle"""
+        cache_path = os.path.splitext(model_path)[0] + ".safetensors"
+        # A deployment may ship only the safetensors copy; with both, a newer pickle wins
+        if os.path.exists(cache_path) and (not os.path.exists(model_path)
+                                           or os.path.getmtime(cache_path) >= os.path.getmtime(model_path)):
+            return load_file(cache_path)
+
+        try:
+            state_dict = torch.load(model_path, map_location="cpu", weights_only=True, mmap=True)
+        except RuntimeError:
+            # Legacy (non-zip) checkpoints cannot be memory-mapped
+            state_dict = torch.load(model_path, map_location="cpu", weights_only=True)
+        try:
+            save_file({name: tensor.contiguous() for name, tensor in state_dict.items()}, cache_path)
+        except OSError:
+            pass  # Read-only model directory: keep loading the pickle
+        return state_dict
+
+    def estimate_pose(self, frame, bbox, landmarks=None):
         """Estimate head pose from face region."""
         x, y, w, h = bbox
         face_img = frame[y:y+h, x:x+w]
         if face_img.size == 0:
             return None
+        return self.estimate_pose_batch([face_img])[0]
 
+    def estimate_pose_batch(self, face_imgs):
+        """Estimate head pose for several face crops with one forward pass."""
         try:
-            pil_img = Image.fromarray(cv2.cvtColor(face_img, cv2.COLOR_BGR2RGB))
-            img_tensor = self.transform(pil_img).unsqueeze(0).to(self.device)
+            img_tensor = self.preprocess(face_imgs).to(self.device)
             with torch.no_grad():
-                yaw, pitch, roll = self.model(img_tensor)
+                yaw, pitch, roll = self.runner(img_tensor)
                 yaw_pred = torch.sum(torch.softmax(yaw, dim=1) * self.idx_tensor, dim=1) * 3 - 99
                 pitch_pred = torch.sum(torch.softmax(pitch, dim=1) * self.idx_tensor, dim=1) * 3 - 99
                 roll_pred = torch.sum(torch.softmax(roll, dim=1) * self.idx_tensor, dim=1) * 3 - 99
+        except Exception:
+            return [None] * len(face_imgs)
 
-            yaw_value, pitch_value, roll_value = yaw_pred.item(), pitch_pred.item(), roll_pred.item()
+        poses = []
+        for yaw_value, pitch_value, roll_value in zip(yaw_pred.tolist(), pitch_pred.tolist(), roll_pred.tolist()):
             orientation = self._get_head_orientation(yaw_value, pitch_value)
-            self.pose_list.append(orientation)
-            return {"yaw": yaw_value, "pitch": pitch_value, "roll": roll_value, "orientation": orientation}
-        except Exception:
-            return None
+            poses.append({"yaw": yaw_value, "pitch": pitch_value, "roll": roll_value, "orientation": orientation})
+        return poses
 
-    def draw_axis(self, img, yaw, pitch, roll, tdx, tdy, size=50):
+    @staticmethod
+    def draw_axis(img, yaw, pitch, roll, tdx, tdy, size=50):
         pitch = pitch * np.pi / 180
         yaw = -(yaw * np.pi / 180)
         roll = roll * np.pi / 180
@@ -80,13 +117,13 @@ class HeadOrientation:
         return "forward"
     
 
-    def get_pose_summary(self):
-        """Return a summary of detected pose."""
-        if not self.pose_list:
+    @staticmethod
+    def get_pose_summary(pose_stats):
+        """Return a summary of the poses counted during a session."""
+        if not pose_stats:
             return {"message": "No pose detected"}
         
-        pose_counter = Counter(self.pose_list)
-        most_common_pose = pose_counter.most_common(1)[0][0]
+        most_common_pose = pose_stats.most_common()
         return {
             "most_common_head_pose": most_common_pose
         }
\ No newline at end of file
@@ -0,0 +1,56 @@
+import math
+import numpy as np
+import cv2
+from .orientation import HeadOrientation
+
+
+class PnPHeadOrientation:
+    """Head pose from the dlib landmarks with cv2.solvePnP, without Hopenet.
+
+    Six landmarks are matched against a generic 3D face model and the
+    recovered rotation is expressed in Hopenet's conventions (degrees;
+    positive yaw = face turned to the subject's right, positive pitch = up,
+    positive roll = clockwise in the image), so results drop into
+    `draw_axis`, `_get_head_orientation` and the session summaries unchanged.
+    """
+    # Nose tip, chin, outer eye corners and mouth corners; model y points up, z out of the face
+    LANDMARK_IDS = [30, 8, 36, 45, 48, 54]
+    MODEL_POINTS = np.array([
+        (0.0, 0.0, 0.0),
+        (0.0, -330.0, -65.0),
+        (-225.0, 170.0, -135.0),
+        (225.0, 170.0, -135.0),
+        (-150.0, -150.0, -125.0),
+        (150.0, -150.0, -125.0),
+    ], dtype=np.float64)
+
+    draw_axis = staticmethod(HeadOrientation.draw_axis)
+    get_pose_summary = staticmethod(HeadOrientation.get_pose_summary)
+
+    def estimate_pose(self, frame, bbox, landmarks=None):
+        """Estimate head pose from the (68, 2) face landmarks."""
+        if landmarks is None:
+            return None
+        image_points = landmarks[self.LANDMARK_IDS].astype(np.float64)
+        height, width = frame.shape[:2]
+        # Pinhole camera with focal length ~ image width and no distortion
+        camera_matrix = np.array([[width, 0, width / 2], [0, width, height / 2], [0, 0, 1]], dtype=np.float64)
+        ok, rvec, _ = cv2.solvePnP(self.MODEL_POINTS, image_points, camera_matrix, None,
+                                   flags=cv2.SOLVEPNP_ITERATIVE)
+        if not ok:
+            return None
+
+        rotation, _ = cv2.Rodrigues(rvec)
+        yaw, pitch, roll = self._angles(rotation)
+        orientation = HeadOrientation._get_head_orientation(yaw, pitch)
+        return {"yaw": yaw, "pitch": pitch, "roll": roll, "orientation": orientation}
+
+    @staticmethod
+    def _angles(rotation):
+        # Camera axes: x right, y down, z away from the camera. A frontal face points along -z
+        facing = rotation[:, 2]
+        across = rotation[:, 0]
+        yaw = math.degrees(math.atan2(-facing[0], -facing[2]))
+        pitch = math.degrees(math.atan2(-facing[1], math.hypot(facing[0], facing[2])))
+        roll = math.degrees(math.atan2(across[1], across[0]))
+        return yaw, pitch, roll
@@ -0,0 +1,87 @@
+import threading
+import uuid
+from core.config import MULTI_FACE, POSE_ENGINE, RECORDING
+from core.decoding import decode_request
+from core.metrics import METRICS
+from face_analyzer import FaceAnalyzer
+
+
+class Session:
+    """One tracking session: its analyzer plus a lock serializing its frames."""
+    def __init__(self, session_id, analyzer):
+        self.session_id = session_id
+        self.analyzer = analyzer
+        self.lock = threading.Lock()
+
+    def process_frame(self, contents, raw_shape=None):
+        """Decode a frame and analyze it (runs on a worker thread).
+
+        `contents` is an encoded image, or raw pixels when `raw_shape` gives
+        their (width, height, channels).
+        """
+        with self.analyzer.timings.time("decode"):
+            try:
+                frame = decode_request(contents, raw_shape)
+            except ValueError as e:
+                return {"error": str(e)}
+        return self.analyze_frame(frame)
+
+    def analyze_frame(self, frame):
+        """Analyze an already decoded BGR frame"""
+        # Frames of one session share calibration and counters, so they run one at a time (in order
+        # when submitted to the FrameExecutor with the session ID as key; the lock also covers stats and close)
+        with self.lock:
+            result, _, _ = self.analyzer.analyze(frame)
+        METRICS.frame_done()
+        if result is None:
+            return {"message": "No face detected in frame"}
+        return result
+
+    def window_stats(self, seconds):
+        with self.lock:
+            return self.analyzer.get_window_stats(seconds)
+
+    def close(self):
+        """Wait for in-flight frames, then save and return the session report"""
+        with self.lock:
+            self.analyzer.stop_recording()
+            report = self.analyzer.generate_report()
+            self.analyzer.save_report()
+        return report
+
+
+class SessionManager:
+    """Tracking sessions keyed by ID, all backed by one shared ModelRegistry."""
+    def __init__(self, models):
+        self.models = models
+        self.sessions = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.sessions)
+
+    @property
+    def load_timings(self):
+        return self.models.load_timings
+
+    def start(self, pose_engine=POSE_ENGINE, multi_face=MULTI_FACE["enabled"], record=RECORDING["enabled"],
+              session_id=None):
+        """Create a new session and return its ID (a new one unless `session_id` is given)"""
+        session_id = session_id or uuid.uuid4().hex
+        analyzer = FaceAnalyzer(self.models, pose_engine, multi_face, record)
+        analyzer.start_session()
+        with self._lock:
+            self.sessions[session_id] = Session(session_id, analyzer)
+        return session_id
+
+    def get(self, session_id):
+        """Return a session, or None if it does not exist"""
+        return self.sessions.get(session_id)
+
+    def stop(self, session_id):
+        """End a session, save its report and return it (None if unknown)"""
+        with self._lock:
+            session = self.sessions.pop(session_id, None)
+        if session is None:
+            return None
+        return session.close()
@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from core.decoding import decode_request, raw_frame
+
+
+@pytest.mark.parametrize("width, height, data", [(0, 0, b""), (-1, -3, b"\0" * 3), (4, 0, b"")])
+def test_raw_frames_need_positive_dimensions(width, height, data):
+    with pytest.raises(ValueError, match="width and height must be positive"):
+        decode_request(data, (width, height, 1))
+
+
+def test_raw_frame_wraps_the_pixels():
+    frame = raw_frame(bytes(range(24)), 4, 2)
+    assert frame.shape == (2, 4, 3)
+    assert np.array_equal(frame.reshape(-1), np.arange(24))
@@ -0,0 +1,51 @@
+import random
+import threading
+import time
+from core.executor import FrameExecutor
+
+
+def test_frames_of_one_session_run_in_order_one_at_a_time():
+    executor = FrameExecutor(max_workers=4, max_pending=64)
+    order, running, overlaps = [], [], []
+    lock = threading.Lock()
+
+    def analyze(seq):
+        with lock:
+            running.append(seq)
+            if len(running) > 1:
+                overlaps.append(list(running))
+        time.sleep(random.uniform(0, 0.005))
+        with lock:
+            running.remove(seq)
+            order.append(seq)
+        return seq
+
+    futures = [executor.submit(analyze, seq, key="session") for seq in range(40)]
+    assert [future.result(5) for future in futures] == list(range(40))
+    executor.shutdown()
+    assert order == list(range(40))
+    assert not overlaps
+
+
+def test_busy_session_leaves_threads_for_the_others():
+    executor = FrameExecutor(max_workers=2, max_pending=64)
+    release = threading.Event()
+    busy = [executor.submit(release.wait, 5, key="busy") for _ in range(10)]
+    # The busy session holds one thread; another session still gets the second one
+    assert executor.submit(lambda: "done", key="other").result(2) == "done"
+    release.set()
+    assert all(future.result(5) for future in busy)
+    executor.shutdown()
+
+
+def test_queued_frames_count_against_max_pending():
+    executor = FrameExecutor(max_workers=2, max_pending=3)
+    release = threading.Event()
+    futures = [executor.submit(release.wait, 5, key="session") for _ in range(3)]
+    assert executor.submit(release.wait, 5, key="session") is None
+    assert executor.dropped == 1
+    release.set()
+    for future in futures:
+        future.result(5)
+    assert executor.pending == 0
+    executor.shutdown()
@@ -0,0 +1,65 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from core import inference
+from core.inference import check_parity, load_backend
+from modules.head_pose.model import Bottleneck, Hopenet, fuse_for_inference
+
+
+def hopenet():
+    torch.manual_seed(0)
+    return Hopenet(block=Bottleneck, layers=[3, 4, 6, 3], num_bins=66).eval()
+
+
+def tiny_vit():
+    from transformers import ViTConfig, ViTForImageClassification
+    from modules.emotion.emotion_detector import LogitsOnly
+    torch.manual_seed(0)
+    config = ViTConfig(image_size=32, patch_size=8, hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+                       intermediate_size=64, num_labels=7)
+    return LogitsOnly(ViTForImageClassification(config).eval())
+
+
+MODELS = {
+    "hopenet": (hopenet, (2, 3, 224, 224), ("yaw", "pitch", "roll"), fuse_for_inference),
+    "vit": (tiny_vit, (2, 3, 32, 32), ("logits",), None),
+}
+
+
+@pytest.fixture(params=["torchscript", "onnx"])
+def kind(request):
+    if request.param == "onnx":
+        pytest.importorskip("onnxruntime")
+    return request.param
+
+
+@pytest.mark.parametrize("name", MODELS)
+def test_exported_backend_matches_eager(kind, name, tmp_path):
+    build, shape, output_names, prepare = MODELS[name]
+    module = build()
+    example = torch.randn(*shape)
+    backend = load_backend(kind, module, str(tmp_path / name), example, output_names, prepare)
+    check_parity(module, backend, example)
+    check_parity(module, backend, torch.randn(1, *shape[1:]))  # Other batch sizes than the traced one
+
+
+def test_cached_artifact_is_reused_without_another_parity_check(kind, tmp_path, monkeypatch):
+    build, shape, output_names, prepare = MODELS["vit"]
+    module = build()
+    example = torch.randn(*shape)
+    base = str(tmp_path / "vit")
+    load_backend(kind, module, base, example, output_names, prepare, source="weights-v1")
+    artifact = tmp_path / ("vit" + inference.ARTIFACT_EXTENSIONS[kind])
+    exported = artifact.stat().st_mtime_ns
+
+    checks = []
+    monkeypatch.setattr(inference, "check_parity", lambda *args: checks.append(args))
+    monkeypatch.setattr(inference, "export", lambda *args: pytest.fail("the cached artifact was exported again"))
+    load_backend(kind, module, base, example, output_names, prepare, source="weights-v1")
+    assert checks == []
+    assert artifact.stat().st_mtime_ns == exported
+
+    # Other weights: the artifact is checked again
+    load_backend(kind, module, base, example, output_names, prepare, source="weights-v2")
+    assert len(checks) == 1
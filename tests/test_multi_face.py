@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("dlib")
+pytest.importorskip("torch")
+
+from benchmarks.offline import OfflineRegistry, SyntheticFaceDetector, draw_face
+from core.identity import FaceIdentityTracker
+from face_analyzer import FaceAnalyzer
+
+# Face boxes that never overlap, so a face moving between them is a new identity
+POSITIONS = [(20, 20), (230, 20), (440, 20), (20, 260), (230, 260), (440, 260)]
+
+
+class StubEmotion:
+    def detect_emotion_batch(self, face_imgs):
+        return ["Neutral"] * len(face_imgs)
+
+    @staticmethod
+    def get_emotion_summary(emotion_stats):
+        return {"most_common_emotion": emotion_stats.most_common()}
+
+
+class LightRegistry(OfflineRegistry):
+    """Offline models without the ViT: PnP pose and a constant emotion"""
+    @staticmethod
+    def _load_emotion():
+        return StubEmotion()
+
+
+@pytest.fixture(scope="module")
+def models():
+    models = LightRegistry(detector=SyntheticFaceDetector(), pose_engines=("pnp",),
+                           default_pose_engine="pnp", warmup=False)
+    yield models
+    models.close()
+
+
+@pytest.fixture
+def analyzer(models, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    analyzer = FaceAnalyzer(models, pose_engine="pnp", multi_face=True)
+    analyzer.start_session()
+    analyzer.identities = FaceIdentityTracker(min_iou=0.3, max_missed=2)
+    return analyzer
+
+
+def frame_with_face(position):
+    frame = np.full((480, 640, 3), 30, np.uint8)
+    return draw_face(frame, (*position, 180, 200))
+
+
+def test_face_states_stay_bounded_under_identity_churn(analyzer):
+    nb_frames = 300
+    for i in range(nb_frames):
+        analyzer.analyze(frame_with_face(POSITIONS[i % len(POSITIONS)]))
+        # One face in frame plus the ones not retired yet
+        assert len(analyzer.faces) <= analyzer.identities.max_missed + 2
+
+    assert analyzer.identities.next_id > nb_frames // 2
+    left = analyzer.identities.next_id - len(analyzer.faces)
+    assert analyzer.short_lived_faces.faces + len(analyzer.retired_faces) == left
+    assert not analyzer.retired_faces  # Every face stayed for a single frame
+
+    report = analyzer.generate_report()
+    assert report["focus_analysis"]["total_frames"] == nb_frames
+    assert sum(state.total_frames for state in analyzer.all_faces) == nb_frames
+    assert report["session_info"]["faces_seen"] == analyzer.identities.next_id
+    assert len(report["faces"]) == len(analyzer.faces)
+
+
+def test_long_lived_faces_keep_their_own_summary(analyzer):
+    for _ in range(35):
+        analyzer.analyze(frame_with_face(POSITIONS[0]))
+    for _ in range(5):
+        analyzer.analyze(frame_with_face(POSITIONS[4]))
+
+    assert list(analyzer.retired_faces) == [0]
+    assert analyzer.retired_faces[0].total_frames == 35
+    report = analyzer.generate_report()
+    assert report["faces"]["0"]["focus_analysis"]["total_frames"] == 35
+    assert report["focus_analysis"]["total_frames"] == 40
+
+
+def test_report_index_is_only_created_by_save_report(analyzer, tmp_path):
+    assert not (tmp_path / "session_reports" / "index.sqlite").exists()
+    analyzer.analyze(frame_with_face(POSITIONS[0]))
+    assert analyzer.save_report()
+    assert (tmp_path / "session_reports" / "index.sqlite").exists()
@@ -0,0 +1,30 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("safetensors")
+
+from modules.head_pose.model import Bottleneck, Hopenet
+from modules.head_pose.orientation import HeadOrientation
+
+
+def hopenet_state_dict():
+    return Hopenet(block=Bottleneck, layers=[3, 4, 6, 3], num_bins=66).state_dict()
+
+
+def test_weights_load_from_the_safetensors_copy_alone(tmp_path):
+    from safetensors.torch import save_file
+    state_dict = hopenet_state_dict()
+    save_file({name: tensor.contiguous() for name, tensor in state_dict.items()}, str(tmp_path / "hopenet.safetensors"))
+
+    loaded = HeadOrientation._load_weights(str(tmp_path / "hopenet.pkl"))
+    assert loaded.keys() == state_dict.keys()
+    assert torch.equal(loaded["fc_yaw.weight"], state_dict["fc_yaw.weight"])
+
+
+def test_the_pickle_is_converted_next_to_itself(tmp_path):
+    state_dict = hopenet_state_dict()
+    torch.save(state_dict, str(tmp_path / "hopenet.pkl"))
+
+    loaded = HeadOrientation._load_weights(str(tmp_path / "hopenet.pkl"))
+    assert torch.equal(loaded["fc_yaw.weight"], state_dict["fc_yaw.weight"])
+    assert (tmp_path / "hopenet.safetensors").exists()
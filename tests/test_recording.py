@@ -0,0 +1,31 @@
+import math
+import time
+from core.recording import TimeSeriesRecorder, load_recording
+
+
+def row(frame, face_id):
+    return (time.time(), frame, face_id, 1.0, 2.0, 3.0, math.nan, math.nan, 0, 0, 4, 0, 1)
+
+
+def test_face_ids_past_16_bits_are_recorded(tmp_path):
+    recorder = TimeSeriesRecorder(str(tmp_path / "session.ts"), flush_interval=0.01)
+    recorder.record([row(0, 0), row(1, 40000)])
+    recorder.close()
+    summary = recorder.summary()
+    assert (summary["records"], summary["dropped"]) == (2, 0)
+    records, _ = load_recording(summary["path"])
+    assert list(records["face_id"]) == [0, 40000]
+
+
+def test_a_batch_that_cannot_be_written_is_dropped_and_recording_goes_on(tmp_path):
+    recorder = TimeSeriesRecorder(str(tmp_path / "session.ts"), flush_interval=0.01)
+    recorder.record([row(0, 2 ** 40)])  # Does not fit in face_id
+    deadline = time.monotonic() + 5
+    while recorder.dropped == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    recorder.record([row(1, 1)])
+    recorder.close()
+    summary = recorder.summary()
+    assert (summary["records"], summary["dropped"]) == (1, 1)
+    records, _ = load_recording(summary["path"])
+    assert list(records["frame"]) == [1]
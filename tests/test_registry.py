@@ -0,0 +1,7 @@
+import pytest
+from core.registry import ModelRegistry
+
+
+def test_default_pose_engine_must_be_loaded():
+    with pytest.raises(ValueError, match="'hopenet' is not among the loaded engines"):
+        ModelRegistry(pose_engines=("pnp",), default_pose_engine="hopenet")
@@ -0,0 +1,19 @@
+from core.stats import StreamingCounter
+
+
+def test_weighted_counts_keep_len_and_truth_usable():
+    counter = StreamingCounter()
+    assert not counter and len(counter) == 0
+    counter.add("frames")
+    counter.add("focus", 0.25)
+    counter.add("focus", 0.25)
+    assert counter and len(counter) == 2
+    assert counter.total == 1.5
+    merged = StreamingCounter.merged([counter, counter])
+    assert len(merged) == 2 and merged.total == 3.0 and merged["focus"] == 1.0
+
+
+def test_labels_with_no_weight_do_not_make_a_counter_true():
+    counter = StreamingCounter()
+    counter.add("focus", 0.0)
+    assert not counter and len(counter) == 1